@@ -0,0 +1,45 @@
+"""
+Compares the FormParser and BeautifulSoup readers of the PeopleSoft
+query form.
+
+Usage::
+
+    python benchmarks/bench_form.py [inputs]
+"""
+import os
+import sys
+import time
+sys.path.insert(0, os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+from ghrs.parse import read_form, soup_form  # noqa: E402
+
+
+def synthetic_page(inputs):
+    fields = ''.join(
+        f'<div class="ps_box"><label for="f{i}">Field {i}</label>'
+        f'<input type="hidden" name="ICField{i}" id="f{i}" value="{i}"/>'
+        '</div>' for i in range(inputs))
+    script = '<script>' + 'var x = 1;' * 2000 + '</script>'
+    return (f'<html><head>{script}</head><body>'
+            '<form name="win0" method="post" action="/psc/q/?a=1">'
+            f'{fields}</form></body></html>').encode('utf-8')
+
+
+def bench(function, content, repeat=20):
+    best = min(timeit(function, content) for i in range(repeat))
+    print(f'{function.__name__:>10}: {best * 1000:8.2f} ms')
+
+
+def timeit(function, content):
+    start = time.perf_counter()
+    function(content)
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    inputs = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    content = synthetic_page(inputs)
+    assert read_form(content) == soup_form(content)
+    print(f'{inputs} inputs, {len(content) / 1024:.0f} KiB of html')
+    bench(soup_form, content)
+    bench(read_form, content)
@@ -0,0 +1,61 @@
+"""
+Compares the list of dicts and the columnar builders of the
+ICQryDownloadXML DataFrame.
+
+Usage::
+
+    python benchmarks/bench_parse.py [rows]
+"""
+import os
+import sys
+import time
+import xml.etree.ElementTree as ET
+from io import StringIO
+import pandas as pd
+sys.path.insert(0, os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+from ghrs.parse import CHUNK_SIZE, parse_xml  # noqa: E402
+
+
+def synthetic_xml(rows):
+    row = ('<row rownumber="{0}"><EMPLID>{1}</EMPLID><EMPL_RCD>0</EMPL_RCD>'
+           '<FIRST_NAME>First{1}</FIRST_NAME><LAST_NAME>Last{1}</LAST_NAME>'
+           '<ACCT_CD>F94170</ACCT_CD><DUR>2021-01-{2:02d}</DUR>'
+           '<TL_QUANTITY>8</TL_QUANTITY><USER_FIELD_2>JOB{3}</USER_FIELD_2>'
+           '<USER_FIELD_3/><USER_FIELD_5>X</USER_FIELD_5></row>')
+    return ('<?xml version="1.0"?><query>' + ''.join(
+        row.format(i, 1000 + i % 500, 1 + i % 28, i % 40)
+        for i in range(rows)) + '</query>').encode('utf-8')
+
+
+def list_of_dicts(content):
+    return pd.DataFrame([
+        {i.tag: i.text for i in r.iter() if i.tag != 'row'}
+        for r in ET.parse(StringIO(content.decode('utf-8'))).iter('row')])
+
+
+def columnar(content):
+    return pd.DataFrame(parse_xml(
+        content[i:i + CHUNK_SIZE]
+        for i in range(0, len(content), CHUNK_SIZE)))
+
+
+def bench(function, content, rows, repeat=3):
+    best = min(timeit(function, content) for i in range(repeat))
+    print(f'{function.__name__:>15}: {best:8.3f} s {rows / best:12,.0f} '
+          'rows/s')
+
+
+def timeit(function, content):
+    start = time.perf_counter()
+    function(content)
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    content = synthetic_xml(rows)
+    assert list_of_dicts(content).equals(columnar(content))
+    print(f'{rows:,} rows, {len(content) / 2 ** 20:.1f} MiB of xml')
+    bench(list_of_dicts, content, rows)
+    bench(columnar, content, rows)
@@ -0,0 +1,87 @@
+"""
+Measures the request throughput of a GHRS session against a local
+keep-alive server for several connection pool sizes.
+
+A pool smaller than the number of concurrent requests opens and drops
+extra connections, which shows as a higher connection count and a
+lower throughput. On the loopback a new connection is cheap, against
+the intranet every extra connection also costs a TLS handshake.
+
+Usage::
+
+    python benchmarks/bench_pool.py [threads] [requests] [latency_ms]
+"""
+import os
+import sys
+import time
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+sys.path.insert(0, os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+from ghrs.concurrency import Governor, GovernedSession  # noqa: E402
+from ghrs.ghrs import http_adapter  # noqa: E402
+
+
+class Handler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+
+    disable_nagle_algorithm = True
+
+    latency = 0.005
+
+    body = b'x' * 4096
+
+    connections = 0
+
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with Handler.lock:
+            Handler.connections += 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        time.sleep(self.latency)
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, *args):
+        pass
+
+
+def bench(url, pool_maxsize, threads, requests, pool_block=False):
+    session = GovernedSession(Governor())
+    session.mount('http://', http_adapter(pool_maxsize=pool_maxsize,
+                                          pool_block=pool_block))
+    Handler.connections = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(lambda i: session.post(url, data={'i': i}).content,
+                          range(requests)))
+    elapsed = time.perf_counter() - start
+    session.close()
+    print(f'pool_maxsize={pool_maxsize:>3} pool_block={pool_block!s:>5}: '
+          f'{requests / elapsed:8.1f} requests/s, '
+          f'{Handler.connections:>5} connections')
+
+
+if __name__ == '__main__':
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    if len(sys.argv) > 3:
+        Handler.latency = int(sys.argv[3]) / 1000
+    logging.getLogger('urllib3').setLevel(logging.ERROR)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_port}/'
+    for size in (1, 4, 10, threads):
+        bench(url, size, threads, requests)
+    bench(url, 4, threads, requests, pool_block=True)
+    server.shutdown()
@@ -0,0 +1,179 @@
+"""
+Benchmark suite of the parsing, normalisation and summarisation of
+GHRS data, compared against a stored baseline.
+
+Every case runs over the timesheets of 1000 employees generated by
+ghrs.synthetic, as many days as needed for each size, and records the
+best wall time of a few runs, more for the fast cases, and the peak
+memory traced by tracemalloc during one run:
+
+- parse_xml: the streamed xml to columns
+- to_dataframe: the schema conversions of the columns
+- to_dataframe_compact: the same in compact mode
+- summarize_by_week: the weekly summary of the DataFrame
+
+A case is reported as a regression when its time or its peak memory
+exceeds the baseline by more than the tolerance, the exit status is
+then 1. Baselines depend on the machine, record one with --save before
+comparing changes.
+
+Usage::
+
+    python benchmarks/suite.py [--sizes 1000 100000 1000000]
+                               [--repeat 3] [--tolerance 0.25]
+                               [--baseline benchmarks/baseline.json]
+                               [--save]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tracemalloc
+from datetime import date, timedelta
+sys.path.insert(0, os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+from ghrs.parse import (CHUNK_SIZE, SCHEMA, compact_schema,  # noqa: E402
+                        parse_xml, to_dataframe)
+from ghrs.query import Query  # noqa: E402
+from ghrs.synthetic import Timesheets  # noqa: E402
+
+
+SIZES = [1000, 100000, 1000000]
+
+EMPLOYEES = 1000
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        'baseline.json')
+
+
+def chunks(content):
+    return (content[i:i + CHUNK_SIZE]
+            for i in range(0, len(content), CHUNK_SIZE))
+
+
+def cases(rows):
+    """
+    Returns the cases of a payload size.
+
+    Returns:
+        list: (name, function) tuples, the functions take no argument.
+    """
+    days = -(-rows // EMPLOYEES)
+    data = Timesheets(date(2021, 1, 1),
+                      date(2021, 1, 1) + timedelta(days=days - 1),
+                      employees=min(rows, EMPLOYEES), jobs=300)
+    content = data.xml()
+    columns = parse_xml(chunks(content))
+    compact = parse_xml(chunks(content), intern=True)
+    df = data.dataframe()
+    query = Query()
+    return [
+        ('parse_xml', lambda: parse_xml(chunks(content))),
+        ('to_dataframe', lambda: to_dataframe(columns, SCHEMA)),
+        ('to_dataframe_compact',
+         lambda: to_dataframe(compact, compact_schema(SCHEMA))),
+        ('summarize_by_week', lambda: query.summarize_by_week(df)),
+    ]
+
+
+def measure(function, repeat, budget=1.0):
+    """
+    Returns the best wall time in seconds of the runs and the peak
+    traced memory in bytes of one more run.
+
+    Fast cases run more than repeat times, until budget seconds are
+    spent, so their best time is stable.
+    """
+    seconds = float('inf')
+    spent = 0
+    runs = 0
+    while runs < repeat or (spent < budget and runs < 1000):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        seconds = min(seconds, elapsed)
+        spent += elapsed
+        runs += 1
+    tracemalloc.start()
+    try:
+        function()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return seconds, peak
+
+
+def run(sizes, repeat):
+    """
+    Runs every case of every size.
+
+    Returns:
+        dict: {'seconds': ..., 'peak_bytes': ...} keyed by
+        'case[rows]'.
+    """
+    results = {}
+    for rows in sizes:
+        for name, function in cases(rows):
+            seconds, peak = measure(function, repeat)
+            results[f'{name}[{rows}]'] = {'seconds': seconds,
+                                          'peak_bytes': peak}
+            print(f'{name:>22} {rows:>9,} rows: {seconds:9.4f} s '
+                  f'{peak / 2 ** 20:9.1f} MiB', flush=True)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compares results against a baseline.
+
+    Returns:
+        list: Descriptions of the regressions.
+    """
+    regressions = []
+    for key, result in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        for metric in ('seconds', 'peak_bytes'):
+            ratio = result[metric] / reference[metric] \
+                if reference[metric] else 1
+            if ratio > 1 + tolerance:
+                regressions.append(f'{key} {metric}: {ratio:.2f}x the '
+                                   'baseline')
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--save', action='store_true',
+                        help='store the results as the new baseline')
+    args = parser.parse_args(argv)
+    results = run(args.sizes, args.repeat)
+    if args.save:
+        with open(args.baseline, 'w') as f:
+            json.dump({'machine': platform.platform(),
+                       'python': platform.python_version(),
+                       'results': results}, f, indent=2, sort_keys=True)
+        print(f'baseline saved to {args.baseline}')
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f'no baseline at {args.baseline}, run with --save')
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)['results']
+    regressions = compare(results, baseline, args.tolerance)
+    for regression in regressions:
+        print('REGRESSION', regression)
+    if not regressions:
+        print(f'no regression over {args.tolerance:.0%} of the baseline')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
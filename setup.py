@@ -12,4 +12,5 @@ setup(
     test_suite="tests",
     package_dir={"": "src"},
     packages=find_packages(where="src"),
+    extras_require={'async': ['aiohttp']},
     )
\ No newline at end of file
@@ -1,4 +1,10 @@
 from .ghrs import GHRS  # noqa
+from .pool import SessionPool  # noqa
+try:
+    from .aio import AsyncGHRS  # noqa
+except ImportError:
+    # aiohttp is an optional dependency, pip install ghrs[async]
+    pass
 
 __doc__ = """
 
@@ -130,6 +136,227 @@ Args:       date(year, month, day)::
 
 **get_data()** method will return a dataframe of specified dates, Timesheet details.
 
+Long date ranges can be split into calendar aligned chunks ('week',
+'month' or 'year') which are fetched concurrently and concatenated
+in date order::
+
+    get_data = obj.get_data(date(2018,1,1),date(2021,10,10),'F94170','102',
+                            chunk='month', max_workers=4)
+
+**iter_data()** yields the data one chunk at a time as soon as each chunk
+is downloaded, so very long ranges can be streamed into a sink::
+
+    for df in obj.iter_data(date(2018,1,1),date(2021,10,10),'F94170','102',
+                            chunk='month'):
+        df.to_sql('timesheets', engine, if_exists='append')
+
+The next chunk is downloaded in the background while the current one is
+processed, prefetch=0 downloads every chunk only when it is requested.
+
+With chunk='adaptive', a range which fails, times out or exceeds the
+max_latency or max_response_bytes budgets is split in half and retried,
+a download going over a budget being stopped right away, and the chunk
+size that works is remembered per cost center::
+
+    obj.timeout = 300
+    obj.max_latency = 60
+    get_data = obj.get_data(date(2018,1,1),date(2021,10,10),'F94170','102',
+                            chunk='adaptive')
+
+Extracting data for many cost centers.
+--------------------------------------------------
+
+**get_data_many()** fetches several (cost_center, company_code) pairs
+concurrently and returns the combined data along with the pairs that
+failed::
+
+    df, failures = obj.get_data_many([('F94170','102'),('F94171','102')],
+                                     date(2021,1,1),date(2021,3,1))
+
+On-disk cache
+--------------------------------------------------
+
+With a **ResultCache** set, get_data() and its wrappers serve the ISO weeks
+already on disk and fetch only the missing ones. Weeks older than
+recent_weeks are never fetched again, recent weeks are refreshed after
+ttl seconds::
+
+    from ghrs.cache import ResultCache
+
+    obj.cache = ResultCache('C:\\Python\\cache\\ghrs', ttl=3600, recent_weeks=4)
+    df = obj.get_recent_data('F94170','102')
+
+A **RangeCache** keeps the fetched date ranges in memory instead, so the
+overlapping windows of get_recent_data(), get_data_by_weeks() and
+get_data_by_months() are downloaded only once::
+
+    from ghrs.cache import RangeCache
+
+    obj.cache = RangeCache(ttl=3600)
+
+Long running processes can memoize the results of get_data() with a
+**MemoryCache**, bounded by the total memory of the cached DataFrames::
+
+    from ghrs.cache import MemoryCache
+
+    obj.memo = MemoryCache(max_bytes=512 * 2 ** 20, ttl=60)
+    print(obj.memo.hits, obj.memo.misses)
+
+When several threads query the same range at once, a **SingleFlight**
+runs a single fetch and shares its result with the waiting threads::
+
+    from ghrs.concurrency import SingleFlight
+
+    obj.flight = SingleFlight()
+    print(obj.flight.suppressed)
+
+Incremental sync
+--------------------------------------------------
+
+**sync()** keeps a local mirror of a cost center up to date. The first call
+pulls the whole history, the following calls only pull the last 4 weeks
+before the previous sync and upsert the rows by their natural key::
+
+    from ghrs.store import SQLiteStore
+
+    store = SQLiteStore('C:\\Python\\ghrs.db')
+    obj.sync('F94170','102', store)
+    df = store.read('F94170','102')
+
+Pool of authenticated sessions
+--------------------------------------------------
+
+**SessionPool** authenticates several sessions in parallel and exposes
+the same query methods, each query running on a borrowed session::
+
+    from ghrs import SessionPool
+
+    pool = SessionPool(size=8)
+    df = pool.get_data(date(2018,1,1),date(2021,10,10),'F94170','102',
+                       chunk='month', max_workers=8)
+
+Connection pooling
+--------------------------------------------------
+
+The connections of a GHRS session are kept alive in a pool of
+**pool_maxsize** connections per host, which should be at least the
+number of concurrent queries. Failed connections are retried
+**max_retries** times and every request is bounded by **timeout**::
+
+    GHRS.pool_maxsize = 32
+    GHRS.pool_block = True
+    GHRS.timeout = 300
+    obj = GHRS()
+
+Rate limiting
+--------------------------------------------------
+
+The sessions of a process share **ghrs.concurrency.GOVERNOR**, which can
+limit the request rate and the requests in flight per endpoint (url
+prefix). With lock_path, the in flight limit is shared by all the
+processes of the machine::
+
+    from ghrs.concurrency import GOVERNOR
+
+    GOVERNOR.configure('https://hcms.saipemnet.saipem.intranet',
+                       rate=5, burst=5, max_in_flight=8,
+                       lock_path='C:\\Python\\locks\\hcms')
+    GOVERNOR.configure(GHRS.auth_url, rate=1)
+
+Asyncio client
+--------------------------------------------------
+
+**AsyncGHRS** exposes awaitable equivalents of authenticate(), get_data()
+and the get_data_by_* wrappers. It requires aiohttp::
+
+    from ghrs import AsyncGHRS
+
+    async with AsyncGHRS() as obj:
+        df = await obj.get_data(date(2020,1,1),date(2021,10,10),'F94170','102')
+
+Column types
+--------------------------------------------------
+
+The columns of the returned DataFrame are converted according to
+**ghrs.parse.SCHEMA**, a mapping of column name to one of the types
+'date', 'float' or 'str' of **ghrs.parse.CONVERTERS**. The schema can be
+extended per object::
+
+    from ghrs.parse import SCHEMA
+
+    obj.schema = {**SCHEMA, 'EMPL_RCD': 'float'}
+
+Compact mode
+--------------------------------------------------
+
+With **compact** set, the repeated text columns (EMPLID, names, ACCT_CD,
+EMPL_RCD and the USER_FIELD_* job fields) are returned as pandas
+categoricals, which takes a fraction of the memory on long ranges::
+
+    obj.compact = True
+
+Timing
+--------------------------------------------------
+
+Callables in **hooks** receive a **ghrs.timing.Sample** with the wall
+time, bytes and rows of every phase of authenticate() and get_data():
+the form reads, the #ICOK post, the download, the xml parsing and the
+column conversions. **Timings** adds them up per phase::
+
+    from ghrs.timing import Timings
+
+    timings = Timings()
+    obj.hooks = [timings]
+    df = obj.get_data(date(2021,1,1),date(2021,10,10),'F94170','102')
+    print(timings.report())
+
+Long running workers can expose the same samples as Prometheus metrics:
+counters by phase and outcome, latency histograms, bytes, rows,
+authentications and the hit ratio of the watched caches::
+
+    from ghrs.metrics import Metrics
+
+    metrics = Metrics()
+    obj.hooks = [metrics]
+    metrics.watch('memo', obj.memo)
+    metrics.serve(9108)
+
+Offline server
+--------------------------------------------------
+
+**ghrs.fake.FakePeopleSoft** is a local stand-in of the PeopleSoft server
+reproducing the authentication redirects, the query form, the #ICOK post
+and the #ICQryDownloadXML download, with a configurable number of rows per
+day and latency. **client()** returns a GHRS object pointed at it::
+
+    from ghrs.fake import FakePeopleSoft
+
+    with FakePeopleSoft(employees=500, latency=0.1) as server:
+        obj = server.client()
+        df = obj.get_data(date(2021,1,1),date(2021,12,31),'F94170','102',
+                          chunk='month')
+
+Synthetic data
+--------------------------------------------------
+
+**ghrs.synthetic.Timesheets** generates GHRS shaped timesheets for
+benchmarks and stress tests, with a configurable number of employees,
+cost centers, job codes, days and missing values. The rows are returned
+as an ICQryDownloadXML response streamed in chunks, or directly as the
+DataFrame get_data() would return::
+
+    from ghrs.synthetic import Timesheets
+
+    data = Timesheets(date(2017,1,1),date(2021,12,31), employees=20000,
+                      cost_centers=['F94170','F94171'], jobs=500,
+                      null_rates={'USER_FIELD_3': 0.3})
+    df = data.dataframe(compact=True)
+
+    with FakePeopleSoft(timesheets=lambda start, end, cost_center:
+                        Timesheets(start, end, employees=5000,
+                                   cost_centers=[cost_center])) as server:
+        obj = server.client()
+
 GHRS Data Summarisation
 ------------------------
 
@@ -0,0 +1,240 @@
+import asyncio
+from base64 import b64encode
+import ssl
+from collections import namedtuple
+from xml.etree.ElementTree import ParseError
+import aiohttp
+from dateutil.relativedelta import relativedelta
+from yarl import URL
+from .ghrs import GHRS, Credentials
+from .parse import (CHUNK_SIZE, RowParser, compact_schema, concat,
+                    read_form, to_dataframe)
+from .query import query_keys, split_date_range, week_window
+
+
+Page = namedtuple('Page', ['status_code', 'content', 'url'])
+
+
+class AsyncGHRS(Credentials):
+    """
+    Class for initializing an asyncio GHRS connection.
+
+    The awaitable methods mirror the blocking GHRS class. The
+    session has to be authenticated before querying, either by
+    awaiting authenticate() or by using the object as an async
+    context manager::
+
+        async with AsyncGHRS() as obj:
+            df = await obj.get_recent_data('F94170', '102')
+    """
+
+    api_url = GHRS.api_url
+
+    auth_url = GHRS.auth_url
+
+    header = GHRS.header
+
+    schema = GHRS.schema
+
+    compact = GHRS.compact
+
+    def __init__(self, *args, **kwargs):
+        """
+        Constructor Method for Class AsyncGHRS.
+
+        Args:
+            cert (str): Optional path to a CA bundle used to verify
+            the server.
+
+            user (str): Optional user id. When not given, the
+            credentials are loaded as in GHRS.
+
+            password (str): Optional password.
+        """
+        self.cert = kwargs.get('cert', '')
+        if 'user' in kwargs:
+            self.USER, self.PASS = kwargs['user'], kwargs.get('password', '')
+        else:
+            self.load_credentials()
+        self.session = None
+        self.response = None
+
+    async def __aenter__(self):
+        self.response = await self.authenticate(cert=self.cert)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        """
+        This method closes the underlying aiohttp session.
+        """
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def authenticate(self, cert=''):
+        """
+        This method authenticates the session by following the
+        redirect chain of the api url.
+
+        Args:
+            cert (str): Optional path to a CA bundle.
+
+        Returns:
+            Page: The last page of the redirect chain.
+        """
+        await self.close()
+        ssl_context = ssl.create_default_context(cafile=cert or None)
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(ssl=ssl_context))
+        url = URL(self.api_url, encoded=True)
+        headers = {}
+        for i in range(25):
+            async with self.session.get(url, allow_redirects=False,
+                                        headers=headers) as response:
+                page = Page(response.status, await response.read(), url)
+                if response.status != 302:
+                    break
+                url = url.join(URL(response.headers['Location'],
+                                   encoded=True))
+            headers = {}
+            if str(url).startswith(self.auth_url):
+                headers['Authorization'] = 'Basic ' + b64encode(
+                    f'{self.USER}:{self.PASS}'.encode('utf-8')).decode()
+        self.response = page
+        return page
+
+    async def _post(self, url, data):
+        async with self.session.post(url, data=data,
+                                     headers=self.header) as response:
+            return Page(response.status, await response.read(), url)
+
+    async def get_data(self, start_date, end_date, cost_center,
+                       company_code, chunk=None, max_workers=4):
+        """
+        Awaitable equivalent of GHRS.get_data().
+
+        Args:
+            start_date (date): Starting date for extracting data.
+
+            end_date (date): Ending date for extracting data.
+
+            cost_center (str): Cost center.
+
+            company_code (str): Company code.
+
+            chunk (str): Optional, one of 'week', 'month' or 'year'.
+
+            max_workers (int): Maximum number of chunks in flight.
+
+        Return:
+              pandas.DataFrame: Timesheet details of the employees on
+              specified timerange, or None on failure.
+        """
+        if chunk is None or start_date > end_date:
+            return await self._fetch_data(start_date, end_date,
+                                          cost_center, company_code)
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def fetch(start, end):
+            async with semaphore:
+                return await self._fetch_data(start, end, cost_center,
+                                              company_code)
+
+        frames = await asyncio.gather(*[
+            fetch(*r) for r in split_date_range(start_date, end_date,
+                                                chunk)])
+        if any(df is None for df in frames):
+            return None
+        return concat(frames)
+
+    async def iter_data(self, start_date, end_date, cost_center,
+                        company_code, chunk='month'):
+        """
+        Asynchronous generator equivalent of GHRS.iter_data().
+        """
+        for start, end in split_date_range(start_date, end_date, chunk):
+            yield await self._fetch_data(start, end, cost_center,
+                                         company_code)
+
+    async def _fetch_data(self, start_date, end_date, cost_center,
+                          company_code):
+        """
+        Drives the query form for a single date range.
+
+        Return:
+              pandas.DataFrame: Timesheet details of the range, or None
+              when a hop fails, times out or the xml is malformed, as
+              in the blocking Query._download().
+        """
+        try:
+            return await self._fetch_once(start_date, end_date,
+                                          cost_center, company_code)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ParseError):
+            return None
+
+    async def _fetch_once(self, start_date, end_date, cost_center,
+                          company_code):
+        if self.response is None or self.response.status_code != 200:
+            return None
+        form = read_form(self.response.content)
+        if form is None:
+            return None
+        action, data = form
+        data.update(query_keys(start_date, end_date, cost_center,
+                               company_code))
+        response = await self._post(self.response.url.join(URL(action)),
+                                    data)
+        if response.status_code != 200:
+            return None
+        form = read_form(response.content)
+        if form is None:
+            return None
+        action, data = form
+        data.update({'ICAction': '#ICQryDownloadXML'})
+        async with self.session.post(response.url.join(URL(action)),
+                                     data=data,
+                                     headers=self.header) as response:
+            if response.status != 200:
+                return None
+            parser = RowParser(intern=self.compact)
+            async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                parser.feed(chunk)
+        schema = compact_schema(self.schema) if self.compact \
+            else self.schema
+        return to_dataframe(parser.close(), schema)
+
+    async def get_recent_data(self, cost_center, company_code):
+        """
+        Awaitable equivalent of GHRS.get_recent_data().
+        """
+        start_date, end_date = week_window(relativedelta(weeks=8),
+                                           relativedelta(weeks=8))
+        return await self.get_data(start_date, end_date, cost_center,
+                                   company_code)
+
+    async def get_data_by_weeks(self, weeks, cost_center, company_code):
+        """
+        Awaitable equivalent of GHRS.get_data_by_weeks().
+        """
+        start_date, end_date = week_window(relativedelta(weeks=weeks))
+        return await self.get_data(start_date, end_date, cost_center,
+                                   company_code)
+
+    async def get_data_by_months(self, months, cost_center, company_code):
+        """
+        Awaitable equivalent of GHRS.get_data_by_months().
+        """
+        start_date, end_date = week_window(relativedelta(months=months))
+        return await self.get_data(start_date, end_date, cost_center,
+                                   company_code)
+
+    async def get_data_by_year(self, year, cost_center, company_code):
+        """
+        Awaitable equivalent of GHRS.get_data_by_year().
+        """
+        start_date, end_date = week_window(relativedelta(years=year))
+        return await self.get_data(start_date, end_date, cost_center,
+                                   company_code)
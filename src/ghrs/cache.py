@@ -0,0 +1,458 @@
+import os
+import json
+import time
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import date
+import pandas as pd
+from dateutil.relativedelta import relativedelta
+from .parse import concat, to_dataframe
+from .query import split_date_range
+
+# A cache of Query.get_data() implements three methods, where key is
+# a (cost_center, company_code, compact) tuple:
+#
+#   gaps(key, start_date, end_date): the date ranges to fetch
+#   store(key, start_date, end_date, df): stores a fetched range
+#   read(key, start_date, end_date): the DataFrame of the whole range
+
+
+def trim(df, start_date, end_date):
+    """
+    Returns the rows of a DataFrame with DUR in an inclusive range.
+    """
+    if df.empty or 'DUR' not in df.columns:
+        return df
+    return df[(df['DUR'] >= start_date) & (df['DUR'] <= end_date)] \
+        .reset_index(drop=True)
+
+
+class ResultCache():
+    """
+    Class for caching GHRS data on disk, one JSON file per
+    (cost_center, company_code, ISO week).
+
+    Timesheets of closed weeks do not change anymore, so a cached week
+    which ended more than recent_weeks weeks ago is never refreshed.
+    The recent, current and future weeks are refreshed once they are
+    older than ttl seconds.
+
+    The files only hold the values and the column types, so a shared
+    directory cannot inject code the way a pickle could. A file which
+    cannot be read is deleted and its week fetched again.
+
+    Usage::
+
+        obj.cache = ResultCache('C:\\Python\\cache\\ghrs')
+        df = obj.get_recent_data('F94170', '102')
+    """
+
+    def __init__(self, directory, ttl=3600, recent_weeks=4):
+        """
+        Constructor Method for Class ResultCache.
+
+        Args:
+            directory (str): Directory of the cache files, created if
+            needed.
+
+            ttl (float): Seconds after which a recent week is fetched
+            again.
+
+            recent_weeks (int): Number of weeks before the current week
+            which are still open to corrections.
+        """
+        self.directory = os.path.expanduser(directory)
+        self.ttl = ttl
+        self.recent_weeks = recent_weeks
+        self.hits = 0
+        self.misses = 0
+        self.local = threading.local()
+
+    def path(self, key, week):
+        """
+        Returns the path of the cache file of a week.
+
+        Args:
+            key (tuple): (cost_center, company_code, compact).
+
+            week (date): Monday of the ISO week.
+
+        Returns:
+            str: Path of the JSON file.
+        """
+        cost_center, company_code, compact = key
+        year, number, _ = week.isocalendar()
+        name = f'{year}-W{number:02d}' + ('-compact' if compact else '')
+        return os.path.join(self.directory,
+                            f'{cost_center}_{company_code}',
+                            name + '.json')
+
+    def is_closed(self, week):
+        """
+        Returns whether a week is old enough to never change again.
+
+        Args:
+            week (date): Monday of the ISO week.
+
+        Returns:
+            bool: True for a closed week.
+        """
+        today = date.today()
+        current = today - relativedelta(days=today.weekday())
+        return week < current - relativedelta(weeks=self.recent_weeks)
+
+    def is_valid(self, key, week):
+        """
+        Returns whether a week is cached and not stale.
+        """
+        try:
+            age = time.time() - os.path.getmtime(self.path(key, week))
+        except OSError:
+            return False
+        return self.is_closed(week) or age <= self.ttl
+
+    def gaps(self, key, start_date, end_date):
+        """
+        Returns the runs of consecutive weeks which are missing, stale
+        or unreadable, as date ranges of whole weeks.
+
+        The weeks read are kept for the next read() of the thread.
+        """
+        ranges = []
+        self.local.frames = {}
+        for week in weeks_of(start_date, end_date):
+            path = self.path(key, week)
+            if self.is_valid(key, week):
+                df = self.load(path)
+                if df is not None:
+                    self.local.frames[path] = df
+                    self.hits += 1
+                    continue
+            self.misses += 1
+            if ranges and ranges[-1][1] + relativedelta(days=1) == week:
+                ranges[-1] = (ranges[-1][0], week + relativedelta(days=6))
+            else:
+                ranges.append((week, week + relativedelta(days=6)))
+        return ranges
+
+    def store(self, key, start_date, end_date, df):
+        """
+        Stores a fetched range of whole weeks, one file per week.
+
+        Each file is written to a temporary file first and moved in
+        place, so concurrent readers never see a partial file.
+        """
+        weeks = weeks_of(start_date, end_date)
+        for week, part in split_by_week(df, weeks).items():
+            path = self.path(key, week)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, temp = tempfile.mkstemp(dir=os.path.dirname(path),
+                                        suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(dump_frame(part), f)
+                os.replace(temp, path)
+            except BaseException:
+                os.remove(temp)
+                raise
+
+    def read(self, key, start_date, end_date):
+        """
+        Reads the cached weeks of a range, trimmed to the range.
+        """
+        frames = getattr(self.local, 'frames', {})
+        self.local.frames = {}
+        paths = [self.path(key, week)
+                 for week in weeks_of(start_date, end_date)]
+        return trim(concat([frames[path] if path in frames
+                            else self.load(path, remove=False)
+                            for path in paths]),
+                    start_date, end_date)
+
+    def load(self, path, remove=True):
+        """
+        Loads the DataFrame of a cache file.
+
+        Args:
+            path (str): Path of the JSON file.
+
+            remove (bool): Whether to delete a file which cannot be
+            read and return None, instead of raising.
+
+        Returns:
+            pandas.DataFrame: The cached week.
+        """
+        try:
+            with open(path, encoding='utf-8') as f:
+                return load_frame(json.load(f))
+        except FileNotFoundError:
+            if not remove:
+                raise
+            return None
+        except (OSError, ValueError, KeyError, TypeError):
+            if not remove:
+                raise
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return None
+
+
+class RangeCache():
+    """
+    Class for caching GHRS data in memory, indexed by the date ranges
+    already fetched per (cost_center, company_code).
+
+    A request is answered from the covered ranges, only the uncovered
+    sub ranges are fetched from the server and merged in. Overlapping
+    windows, such as those of get_data_by_weeks() and
+    get_data_by_months(), are downloaded only once. A request fully
+    covered counts as a hit, any other as a miss.
+
+    Usage::
+
+        obj.cache = RangeCache(ttl=3600)
+    """
+
+    def __init__(self, ttl=None):
+        """
+        Constructor Method for Class RangeCache.
+
+        Args:
+            ttl (float): Optional seconds after which a fetched range
+            is dropped and fetched again.
+        """
+        self.ttl = ttl
+        self.ranges = {}
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def _ranges(self, key):
+        ranges = self.ranges.setdefault(key, [])
+        if self.ttl is not None:
+            now = time.monotonic()
+            ranges[:] = [r for r in ranges if now - r[2] <= self.ttl]
+        return ranges
+
+    def gaps(self, key, start_date, end_date):
+        """
+        Returns the sub ranges of a range which are not covered.
+        """
+        gaps = []
+        begin = start_date
+        with self.lock:
+            ranges = sorted(self._ranges(key), key=lambda r: r[0])
+        for start, end, fetched, df in ranges:
+            if end < begin:
+                continue
+            if start > end_date:
+                break
+            if start > begin:
+                gaps.append((begin, start - relativedelta(days=1)))
+            begin = max(begin, end + relativedelta(days=1))
+        if begin <= end_date:
+            gaps.append((begin, end_date))
+        with self.lock:
+            if gaps:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return gaps
+
+    def store(self, key, start_date, end_date, df):
+        """
+        Stores a fetched range.
+
+        The stored ranges overlapping it are trimmed to their parts
+        outside of it, never dropped, so a concurrent caller which
+        found its range covered can still read all of it.
+        """
+        day = relativedelta(days=1)
+        with self.lock:
+            ranges = []
+            for start, end, fetched, part in self._ranges(key):
+                if end < start_date or start > end_date:
+                    ranges.append((start, end, fetched, part))
+                    continue
+                if start < start_date:
+                    ranges.append((start, start_date - day, fetched,
+                                   trim(part, start, start_date - day)))
+                if end > end_date:
+                    ranges.append((end_date + day, end, fetched,
+                                   trim(part, end_date + day, end)))
+            ranges.append((start_date, end_date, time.monotonic(), df))
+            self.ranges[key] = ranges
+
+    def read(self, key, start_date, end_date):
+        """
+        Reads a covered range from the fetched ranges, in date order.
+        """
+        with self.lock:
+            ranges = sorted(self.ranges.get(key, []), key=lambda r: r[0])
+        return concat([trim(df, start_date, end_date)
+                       for start, end, fetched, df in ranges
+                       if start <= end_date and end >= start_date])
+
+
+class MemoryCache():
+    """
+    Class for memoizing get_data() results in memory, evicting the
+    least recently used DataFrames once their total memory exceeds
+    max_bytes.
+
+    The cached DataFrames are never handed out, every hit returns a
+    copy so callers cannot corrupt the cache.
+
+    Usage::
+
+        obj.memo = MemoryCache(max_bytes=512 * 2 ** 20, ttl=60)
+    """
+
+    def __init__(self, max_bytes=256 * 2 ** 20, ttl=None):
+        """
+        Constructor Method for Class MemoryCache.
+
+        Args:
+            max_bytes (int): Budget of the total DataFrame memory.
+
+            ttl (float): Optional seconds after which an entry expires.
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def _evict(self, key):
+        df, size, stored = self.entries.pop(key)
+        self.bytes -= size
+
+    def get(self, key):
+        """
+        Returns a copy of the cached DataFrame of a key.
+
+        Returns:
+            pandas.DataFrame: The copy, or None on a miss.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and self.ttl is not None and \
+                    time.monotonic() - entry[2] > self.ttl:
+                self._evict(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+        return entry[0].copy()
+
+    def put(self, key, df):
+        """
+        Caches a DataFrame, evicting least recently used entries to
+        stay within max_bytes. A DataFrame larger than max_bytes is
+        not cached.
+
+        Returns:
+            pandas.DataFrame: A copy of df for the caller.
+        """
+        size = int(df.memory_usage(deep=True).sum())
+        if size <= self.max_bytes:
+            with self.lock:
+                if key in self.entries:
+                    self._evict(key)
+                while self.entries and self.bytes + size > self.max_bytes:
+                    self._evict(next(iter(self.entries)))
+                    self.evictions += 1
+                self.entries[key] = (df, size, time.monotonic())
+                self.bytes += size
+        return df.copy()
+
+    def clear(self):
+        """
+        Empties the cache.
+        """
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+
+def column_type(series):
+    """
+    Returns the key of CONVERTERS rebuilding a column from its text, or
+    None for a text column.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return 'category'
+    if pd.api.types.is_float_dtype(series.dtype):
+        return 'float'
+    values = series.dropna()
+    if len(values) and isinstance(values.iloc[0], date):
+        return 'date'
+    return None
+
+
+def dump_frame(df):
+    """
+    Returns a DataFrame as a JSON serializable dict of text columns,
+    of the schema converting them back and of the dtypes of the text
+    columns.
+    """
+    schema = {}
+    text = {}
+    columns = {}
+    for name in df.columns:
+        dtype = column_type(df[name])
+        if dtype is None:
+            text[name] = str(df[name].dtype)
+        else:
+            schema[name] = dtype
+        columns[name] = [None if pd.isna(value) else str(value)
+                         for value in df[name].astype(object)]
+    return {'schema': schema, 'text': text, 'columns': columns}
+
+
+def load_frame(data):
+    """
+    Returns the DataFrame of a dict made by dump_frame().
+    """
+    df = to_dataframe(data['columns'], data['schema'])
+    if df.empty:
+        return pd.DataFrame({name: pd.Series(dtype=object)
+                             for name in data['columns']})
+    return df.astype(data['text'])
+
+
+def weeks_of(start_date, end_date):
+    """
+    Returns the Mondays of the ISO weeks overlapping a range.
+    """
+    return [r[0] - relativedelta(days=r[0].weekday())
+            for r in split_date_range(start_date, end_date, 'week')]
+
+
+def split_by_week(df, weeks):
+    """
+    Splits a DataFrame into one DataFrame per ISO week by DUR.
+
+    Args:
+        df (pandas.DataFrame): Timesheet details.
+
+        weeks (list): Mondays of the ISO weeks to split into.
+
+    Returns:
+        dict: DataFrame keyed by Monday, empty for weeks without rows.
+    """
+    if df.empty or 'DUR' not in df.columns:
+        return {week: df for week in weeks}
+    mondays = pd.to_datetime(df['DUR']).dt.to_period('W-SUN') \
+        .dt.start_time.dt.date
+    parts = {week: part.reset_index(drop=True)
+             for week, part in df.groupby(mondays.values)}
+    return {week: parts.get(week, df.iloc[0:0]) for week in weeks}
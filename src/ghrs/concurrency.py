@@ -0,0 +1,424 @@
+import os
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+import requests
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+
+class Call():
+    """
+    Class for an in flight call of SingleFlight.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight():
+    """
+    Class for deduplicating concurrent identical calls.
+
+    While a call for a key is in flight, further calls for the same key
+    wait for it and receive its result instead of running again.
+
+    Usage::
+
+        obj.flight = SingleFlight()
+    """
+
+    def __init__(self):
+        self.calls = {}
+        self.lock = threading.Lock()
+        self.calls_made = 0
+        self.suppressed = 0
+
+    def do(self, key, function):
+        """
+        Runs function for a key, unless a call for the same key is
+        already in flight, in which case its result is awaited.
+
+        Args:
+            key (hashable): Identity of the call.
+
+            function (callable): Called without arguments.
+
+        Returns:
+            The result of the call. Waiting callers receive a copy when
+            the result has a copy() method, e.g. a DataFrame, taken
+            from a copy made before the caller which ran the call gets
+            its result, so it may be modified by that caller.
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            if call is None:
+                call = self.calls[key] = Call()
+                self.calls_made += 1
+                leader = True
+            else:
+                self.suppressed += 1
+                call.waiters += 1
+                leader = False
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy_of(call.result)
+        try:
+            result = function()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+                waiters = call.waiters
+            if call.error is None and waiters:
+                call.result = copy_of(result)
+            call.done.set()
+        return result
+
+
+def copy_of(result):
+    """
+    Returns a copy of result when it has a copy() method, else result.
+    """
+    return result.copy() if hasattr(result, 'copy') else result
+
+
+def pipeline(function, items, depth=1, workers=1):
+    """
+    Yields function(item) for every item in order, running function in
+    background threads ahead of the consumer.
+
+    At most workers calls run at once and at most depth results wait
+    for the consumer, so a slow consumer holds back the producers
+    instead of buffering every result in memory.
+
+    Args:
+        function (callable): Called with each item.
+
+        items (iterable): Items to process.
+
+        depth (int): Number of results computed ahead of the consumer,
+        0 runs the calls one at a time as they are consumed.
+
+        workers (int): Number of concurrent calls.
+
+    Yields:
+        The results of function, in the order of items.
+    """
+    items = iter(items)
+    pending = deque()
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        while True:
+            while len(pending) < workers + depth:
+                item = next(items, pending)
+                if item is pending:
+                    break
+                pending.append(executor.submit(function, item))
+            if not pending:
+                return
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+class TokenBucket():
+    """
+    Class for a thread safe token bucket rate limiter.
+
+    Tokens are added at rate per second up to burst, every request
+    takes one token and waits while the bucket is empty.
+    """
+
+    def __init__(self, rate, burst=1):
+        """
+        Constructor Method for Class TokenBucket.
+
+        Args:
+            rate (float): Tokens added per second.
+
+            burst (int): Capacity of the bucket.
+        """
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Takes a token, waiting until one is available.
+
+        Returns:
+            float: Seconds waited.
+        """
+        waited = 0
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens
+                              + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            if self.tokens < 0:
+                waited = -self.tokens / self.rate
+        if waited:
+            time.sleep(waited)
+        return waited
+
+
+class FileSemaphore():
+    """
+    Class for a semaphore shared by the processes of a machine, made of
+    value lock files next to path.
+    """
+
+    def __init__(self, path, value, poll=0.05):
+        """
+        Constructor Method for Class FileSemaphore.
+
+        Args:
+            path (str): Path prefix of the lock files.
+
+            value (int): Number of slots.
+
+            poll (float): Seconds between attempts while all slots are
+            taken.
+        """
+        self.paths = [f'{path}.{i}.lock' for i in range(value)]
+        self.poll = poll
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def acquire(self, timeout=None):
+        """
+        Takes a slot, waiting until one is free.
+
+        Args:
+            timeout (float): Optional seconds to wait.
+
+        Returns:
+            file: The open lock file of the slot, to be passed to
+            release(), or None on timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            for path in self.paths:
+                f = open(path, 'a+b')
+                if lock_file(f):
+                    return f
+                f.close()
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            time.sleep(self.poll)
+
+    def release(self, f):
+        """
+        Frees the slot of a lock file returned by acquire().
+        """
+        unlock_file(f)
+        f.close()
+
+
+def lock_file(f):
+    """
+    Locks an open file without blocking.
+
+    Returns:
+        bool: True when the lock was taken.
+    """
+    try:
+        if os.name == 'nt':
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return False
+    return True
+
+
+def unlock_file(f):
+    """
+    Unlocks a file locked by lock_file().
+    """
+    if os.name == 'nt':
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class Limit():
+    """
+    Class for the limits of an endpoint of a Governor.
+    """
+
+    def __init__(self, rate=None, burst=1, max_in_flight=None,
+                 lock_path=None):
+        self.bucket = None if rate is None else TokenBucket(rate, burst)
+        self.in_flight = None
+        self.files = None
+        if max_in_flight is not None:
+            self.in_flight = threading.BoundedSemaphore(max_in_flight)
+            if lock_path is not None:
+                self.files = FileSemaphore(lock_path, max_in_flight)
+
+    def acquire(self):
+        if self.in_flight is not None:
+            self.in_flight.acquire()
+        f = None
+        if self.files is not None:
+            f = self.files.acquire()
+        if self.bucket is not None:
+            self.bucket.acquire()
+        return f
+
+    def release(self, f):
+        if f is not None:
+            self.files.release(f)
+        if self.in_flight is not None:
+            self.in_flight.release()
+
+
+class Governor():
+    """
+    Class for limiting the request rate and the requests in flight per
+    endpoint, shared by every session using it.
+
+    An endpoint is a url prefix, a request is governed by the longest
+    configured prefix of its url. Requests to other urls are not
+    limited.
+
+    Usage::
+
+        from ghrs.concurrency import GOVERNOR
+
+        GOVERNOR.configure('https://hcms.saipemnet.saipem.intranet',
+                           rate=5, burst=5, max_in_flight=8)
+        GOVERNOR.configure(GHRS.auth_url, rate=1)
+    """
+
+    def __init__(self):
+        self.limits = {}
+        self.lock = threading.Lock()
+
+    def configure(self, endpoint, rate=None, burst=1, max_in_flight=None,
+                  lock_path=None):
+        """
+        Sets the limits of an endpoint, replacing any previous limits.
+
+        Args:
+            endpoint (str): Url prefix of the endpoint.
+
+            rate (float): Optional requests per second.
+
+            burst (int): Requests which may be sent at once before the
+            rate applies.
+
+            max_in_flight (int): Optional number of requests in flight.
+
+            lock_path (str): Optional path prefix of lock files, which
+            extends max_in_flight to all the processes using it.
+        """
+        with self.lock:
+            self.limits[endpoint] = Limit(rate, burst, max_in_flight,
+                                          lock_path)
+
+    def limit(self, url):
+        """
+        Returns the Limit of the longest endpoint prefixing url, or None.
+        """
+        matches = [e for e in self.limits if url.startswith(e)]
+        return self.limits[max(matches, key=len)] if matches else None
+
+    @contextmanager
+    def slot(self, url):
+        """
+        Context manager holding a request slot of the endpoint of url.
+        """
+        limit = self.limit(url)
+        if limit is None:
+            yield
+            return
+        f = limit.acquire()
+        try:
+            yield
+        finally:
+            limit.release(f)
+
+
+GOVERNOR = Governor()
+
+
+class GovernedSession(requests.Session):
+    """
+    Class for a requests.Session whose requests are governed by a
+    Governor.
+
+    Every hop of a redirected request holds its own slot, the slot of a
+    hop is released before the next hop is sent. A streamed response
+    holds its slot until it is closed.
+    """
+
+    def __init__(self, governor=GOVERNOR):
+        super().__init__()
+        self.governor = governor
+
+    def send(self, request, **kwargs):
+        if not kwargs.get('allow_redirects', True):
+            return self.send_hop(request, **kwargs)
+        # resolve_redirects() sends the next hops through send() with
+        # allow_redirects=False, so a hop never waits for a second slot
+        # while holding one
+        kwargs = dict(kwargs, allow_redirects=False)
+        response = self.send_hop(request, **kwargs)
+        del kwargs['allow_redirects']
+        history = list(self.resolve_redirects(response, request, **kwargs))
+        if history:
+            history.insert(0, response)
+            response = history.pop()
+            response.history = history
+        return response
+
+    def send_hop(self, request, **kwargs):
+        """
+        Sends a single request without following its redirects, holding
+        a slot of its endpoint.
+        """
+        limit = self.governor.limit(request.url)
+        if limit is None:
+            return super().send(request, **kwargs)
+        f = limit.acquire()
+        try:
+            response = super().send(request, **kwargs)
+        except BaseException:
+            limit.release(f)
+            raise
+        if not kwargs.get('stream'):
+            limit.release(f)
+            return response
+        close = response.close
+        released = []
+
+        def release():
+            try:
+                close()
+            finally:
+                if not released:
+                    released.append(True)
+                    limit.release(f)
+
+        response.close = release
+        return response
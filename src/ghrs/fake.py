@@ -0,0 +1,336 @@
+import time
+import threading
+import secrets
+from base64 import b64encode
+from datetime import datetime
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, quote
+from dateutil.relativedelta import relativedelta
+
+
+API_PATH = '/psc/GHRS_3/EMPLOYEE/PSFT_HR/q/'
+
+API_QUERY = '?ICAction=ICQryNameURL=PUBLIC.SA_REPORT_TS_XSIGHT_ITA'
+
+AUTH_PATH = '/wam/login'
+
+COOKIE = 'PS_TOKEN'
+
+FORM = ('<html><body><form name="win0" action="{action}" method="post">'
+        '{inputs}</form></body></html>')
+
+INPUT = '<input type="hidden" name="{}" value="{}"/>'
+
+
+def form_page(action, inputs):
+    """
+    Returns a PeopleSoft like page with a form of hidden inputs.
+
+    Args:
+        action (str): Url the form posts to.
+
+        inputs (dict): Values of the inputs keyed by name.
+
+    Returns:
+        bytes: The html page.
+    """
+    return FORM.format(action=escape(action), inputs=''.join(
+        INPUT.format(escape(k), escape(v)) for k, v in inputs.items())
+    ).encode('utf-8')
+
+
+def xml_rows(start, end, cost_center, employees):
+    """
+    Returns an ICQryDownloadXML response with one row per employee and
+    day of a range.
+
+    Args:
+        start (str): Starting date as YYYY/MM/DD.
+
+        end (str): Ending date as YYYY/MM/DD.
+
+        cost_center (str): Value of the ACCT_CD fields.
+
+        employees (int): Number of employees.
+
+    Returns:
+        bytes: The xml document.
+    """
+    day = datetime.strptime(start, '%Y/%m/%d').date()
+    end = datetime.strptime(end, '%Y/%m/%d').date()
+    rows = []
+    while day <= end:
+        for emp in range(employees):
+            rows.append(
+                f'<row rownumber="{len(rows) + 1}">'
+                f'<EMPLID>{1000 + emp}</EMPLID><EMPL_RCD>0</EMPL_RCD>'
+                f'<FIRST_NAME>First{emp}</FIRST_NAME>'
+                f'<LAST_NAME>Last{emp}</LAST_NAME>'
+                f'<ACCT_CD>{escape(cost_center)}</ACCT_CD>'
+                f'<DUR>{day.isoformat()}</DUR>'
+                f'<TL_QUANTITY>8</TL_QUANTITY>'
+                f'<USER_FIELD_2>JOB{emp}</USER_FIELD_2>'
+                f'<USER_FIELD_3/><USER_FIELD_5>X</USER_FIELD_5></row>')
+        day += relativedelta(days=1)
+    header = f'<?xml version="1.0"?><query numrows="{len(rows)}">'
+    return (header + ''.join(rows) + '</query>').encode('utf-8')
+
+
+class FakePeopleSoft():
+    """
+    Class for a local stand-in of the GHRS PeopleSoft server, so the
+    whole client can be exercised and benchmarked offline.
+
+    It reproduces the hops used by GHRS:
+
+    - the query page redirects an unauthenticated client to the
+      authentication url, which checks the Basic credentials and
+      redirects back with a session cookie,
+    - the query page serves the prompt form,
+    - the #ICOK post answers with the download form,
+    - the #ICQryDownloadXML post answers with employees rows per day
+      of the requested range.
+
+    Large downloads can be generated by ghrs.synthetic.Timesheets and
+    streamed with a bounded memory. Every request is delayed by latency
+    seconds. expire() drops the sessions, the next posts are
+    redirected as on the real server.
+
+    Usage::
+
+        with FakePeopleSoft(employees=100, latency=0.2) as server:
+            obj = server.client()
+            df = obj.get_data(date(2021,1,1),date(2021,3,31),'F94170','102')
+    """
+
+    def __init__(self, employees=2, latency=0, user='user',
+                 password='password', host='127.0.0.1', port=0,
+                 timesheets=None):
+        """
+        Constructor Method for Class FakePeopleSoft.
+
+        Args:
+            employees (int): Rows per day of the downloads.
+
+            latency (float): Seconds every request is delayed.
+
+            user (str): Accepted user id.
+
+            password (str): Accepted password.
+
+            host (str): Address to listen on.
+
+            port (int): Port to listen on, 0 for any free port.
+
+            timesheets (callable): Optional callable taking the start
+            date, the end date and the cost center of a download and
+            returning a ghrs.synthetic.Timesheets, whose xml is then
+            streamed instead of the employees rows.
+        """
+        self.employees = employees
+        self.timesheets = timesheets
+        self.latency = latency
+        self.authorization = 'Basic ' + b64encode(
+            f'{user}:{password}'.encode('utf-8')).decode()
+        self.user = user
+        self.password = password
+        self.sessions = set()
+        self.requests = {}
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.server.fake = self
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        if host == '127.0.0.1':
+            # aiohttp does not keep the cookies of ip addresses
+            host = 'localhost'
+        return f'http://{host}:{port}'
+
+    @property
+    def api_url(self):
+        return self.url + API_PATH + API_QUERY
+
+    @property
+    def auth_url(self):
+        return self.url + '/wam'
+
+    def start(self):
+        """
+        Starts serving from a daemon thread.
+        """
+        self.thread = threading.Thread(target=self.server.serve_forever,
+                                       args=(0.05,), daemon=True)
+        self.thread.start()
+        return self
+
+    def close(self):
+        """
+        Stops the server.
+        """
+        if self.thread is not None:
+            self.server.shutdown()
+            self.thread = None
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def expire(self):
+        """
+        Drops every session, as when the PeopleSoft sessions time out.
+        """
+        with self.lock:
+            self.sessions.clear()
+
+    def client(self, cls=None, **kwargs):
+        """
+        Returns a client authenticated against this server.
+
+        The client is an instance of a subclass of cls pointing its
+        urls and headers at this server.
+
+        Args:
+            cls (type): Client class, GHRS by default. AsyncGHRS
+            clients have to be authenticated by the caller.
+
+            kwargs: Passed on to the constructor.
+        """
+        if cls is None:
+            from .ghrs import GHRS
+            cls = GHRS
+        header = dict(cls.header, Host=self.url.split('//')[1],
+                      Origin=self.url, Referer=self.api_url)
+        cls = type(cls.__name__, (cls,), {'api_url': self.api_url,
+                                          'auth_url': self.auth_url,
+                                          'header': header})
+        kwargs.setdefault('user', self.user)
+        kwargs.setdefault('password', self.password)
+        return cls(**kwargs)
+
+    def count(self, name):
+        with self.lock:
+            self.requests[name] = self.requests.get(name, 0) + 1
+
+
+class Handler(BaseHTTPRequestHandler):
+    """
+    Class for the requests handler of a FakePeopleSoft, found as the
+    fake attribute of its http server.
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    disable_nagle_algorithm = True
+
+    @property
+    def fake(self):
+        return self.server.fake
+
+    def do_GET(self):
+        time.sleep(self.fake.latency)
+        path = self.path.split('?')[0]
+        if path == AUTH_PATH:
+            self.fake.count('auth')
+            return self.authenticate()
+        if path != API_PATH:
+            return self.reply(404)
+        self.fake.count('page')
+        if not self.authenticated():
+            target = quote(self.fake.api_url, safe='')
+            return self.redirect(f'{self.fake.url}{AUTH_PATH}?TARGET={target}')
+        self.reply(200, form_page(self.fake.api_url, {
+            'ICStateNum': '1', 'ICAction': '', 'ICSID': 'fake'}))
+
+    def do_POST(self):
+        time.sleep(self.fake.latency)
+        length = int(self.headers.get('Content-Length', 0))
+        data = dict(parse_qsl(self.rfile.read(length).decode()))
+        if self.path.split('?')[0] != API_PATH:
+            return self.reply(404)
+        if not self.authenticated():
+            self.fake.count('expired')
+            return self.redirect(self.fake.url + AUTH_PATH)
+        action = data.get('ICAction')
+        self.fake.count(action)
+        actions = {'#ICOK': self.submit,
+                   '#ICQryDownloadXML': self.download}
+        try:
+            return actions[action](data)
+        except (KeyError, ValueError):
+            self.reply(500)
+
+    def submit(self, data):
+        """
+        Answers the #ICOK post with the download form.
+        """
+        self.reply(200, form_page(self.fake.api_url, {
+            'ICStateNum': '2',
+            'InputKeys_bind1': data['InputKeys_bind1'],
+            'InputKeys_bind2': data['InputKeys_bind2'],
+            'InputKeys_ACCT_CD': data['InputKeys_ACCT_CD']}))
+
+    def download(self, data):
+        """
+        Answers the #ICQryDownloadXML post with the rows of the range.
+        """
+        start, end = data['InputKeys_bind1'], data['InputKeys_bind2']
+        cost_center = data['InputKeys_ACCT_CD']
+        if self.fake.timesheets is None:
+            return self.reply(200, xml_rows(start, end, cost_center,
+                                            self.fake.employees),
+                              'text/xml')
+        start, end = (datetime.strptime(day, '%Y/%m/%d').date()
+                      for day in (start, end))
+        self.stream(self.fake.timesheets(start, end, cost_center)
+                    .xml_chunks())
+
+    def authenticate(self):
+        if self.headers.get('Authorization') != self.fake.authorization:
+            return self.reply(401)
+        token = secrets.token_hex(8)
+        with self.fake.lock:
+            self.fake.sessions.add(token)
+        self.redirect(self.fake.api_url, f'{COOKIE}={token}; Path=/')
+
+    def authenticated(self):
+        for cookie in self.headers.get('Cookie', '').split(';'):
+            name, _, value = cookie.strip().partition('=')
+            if name == COOKIE:
+                with self.fake.lock:
+                    return value in self.fake.sessions
+        return False
+
+    def redirect(self, location, cookie=None):
+        self.send_response(302)
+        self.send_header('Location', location)
+        if cookie is not None:
+            self.send_header('Set-Cookie', cookie)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def reply(self, status, body=b'', content_type='text/html'):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def stream(self, chunks):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/xml')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        for chunk in chunks:
+            self.wfile.write(b'%x\r\n%s\r\n' % (len(chunk), chunk))
+        self.wfile.write(b'0\r\n\r\n')
+
+    def log_message(self, *args):
+        pass
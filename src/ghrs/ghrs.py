@@ -1,11 +1,67 @@
 from base64 import b64encode, b64decode
 from os import environ, makedirs, path
+import threading
+import time
 from tqdm import tqdm
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from .concurrency import GOVERNOR, GovernedSession
 from .query import Query
 
 
-class GHRS(Query):
+class Credentials():
+    """
+    Class for loading and storing the GHRS user credentials.
+    """
+
+    def store_credentials(self, location):
+        """
+        This method requires the user to enter the UserId and Password for
+        creating user credentials, if not available.
+
+        Args:
+            Location (str): C:\\Python\\vault\\cred.dat Path to  cred.dat,
+            containing the user credentials.
+
+        Returns:
+               This method stores the user credentials
+               and saves it in C:\\Python\\vault\\cred.dat as base64
+               encrypted file.
+        """
+
+        print('The Credentials supplied will be stored in an encrypted'
+              ' format in your computer\n\n')
+        self.USER = input('Enter your AlphaNumeric User ID\n')
+        self.PASS = input('\nEnter your Password\n')
+        with open(location, 'wb') as f:
+            f.write(b64encode(bytes(f'{self.USER}:{self.PASS}',
+                                    'utf-8')))
+
+    def load_credentials(self):
+        """
+        This method checks for existence of user credentials in your
+        local system. If not available, it creates a directory in path
+        C:\\Python\\vault and redirects to store_credentials method.
+
+        Returns:
+                This method sets the USER and PASS attributes.
+        """
+        vault = path.join(environ['systemdrive'] + '\\', 'Python', 'vault')
+        credentials = path.join(vault, 'cred.dat')
+        if path.exists(vault):
+            if path.exists(credentials):
+                with open(credentials, 'rb') as f:
+                    self.USER, self.PASS = b64decode(
+                        f.read()).decode('utf-8').split(':')
+            else:
+                self.store_credentials(credentials)
+        else:
+            makedirs(vault)
+            self.store_credentials(credentials)
+
+
+class GHRS(Query, Credentials):
     """
     Class for initializing a GHRS connection.
     """
@@ -30,6 +86,37 @@ class GHRS(Query):
         'Referer': api_url,
         'Accept-Language': 'en'}
 
+    governor = GOVERNOR
+
+    pool_connections = 2
+
+    pool_maxsize = 16
+
+    pool_block = False
+
+    max_retries = 2
+
+    def new_session(self):
+        """
+        This method creates the requests session used by authenticate().
+
+        The connection pool of the session keeps up to pool_maxsize
+        connections alive per host, which should be at least the number
+        of concurrent queries. With pool_block, extra requests wait for
+        a free connection instead of opening throwaway ones.
+
+        Returns:
+            GovernedSession: The session, governed by the governor
+            attribute.
+        """
+        session = GovernedSession(self.governor)
+        adapter = http_adapter(self.pool_connections, self.pool_maxsize,
+                               self.pool_block, self.max_retries,
+                               self.backoff)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
     def authenticate(self, cert=''):
         """
         This method authenticates the session
@@ -51,13 +138,14 @@ class GHRS(Query):
             list: A session with status code 200 is established.
         """
 
-        self.session = requests.Session()
+        started = time.perf_counter()
+        self.session = self.new_session()
         self.session.verify = True
         if cert:
             self.session.verify = cert
         responses = []
         responses.append(self.session.get(self.api_url,
-                         allow_redirects=False))
+                         allow_redirects=False, timeout=self.timeout))
         for i in tqdm(range(0, 25, 1)):
             if responses[-1].status_code == 302:
                 if responses[-1].next.url[:len(self.auth_url)] == \
@@ -65,33 +153,46 @@ class GHRS(Query):
                     responses[-1].next.prepare_auth((self.USER,
                                                      self.PASS))
                 responses.append(self.session.send(responses[-1].next,
-                                 allow_redirects=False))
+                                 allow_redirects=False,
+                                 timeout=self.timeout))
             else:
                 break
+        self._emit('authenticate', started,
+                   sum(len(r.content) for r in responses),
+                   ok=responses[-1].status_code == 200)
         return responses[-1]
 
-    def store_credentials(self, location):
+    def check_session(self):
         """
-        This method requires the user to enter the UserId and Password for
-        creating user credentials, if not available.
+        This method checks whether the session is still authenticated.
 
-        Args:
-            Location (str): C:\\Python\\vault\\cred.dat Path to  cred.dat,
-            containing the user credentials.
+        The query page is requested without following redirects, an
+        expired session is redirected to the authentication chain.
 
         Returns:
-               This method stores the user credentials
-               and saves it in C:\\Python\\vault\\cred.dat as base64
-               encrypted file.
+            bool: True when the query page is served directly.
         """
+        try:
+            response = self.session.get(self.api_url,
+                                        allow_redirects=False,
+                                        timeout=self.timeout)
+        except requests.RequestException:
+            return False
+        return response.status_code == 200
 
-        print('The Credentials supplied will be stored in an encrypted'
-              ' format in your computer\n\n')
-        self.USER = input('Enter your AlphaNumeric User ID\n')
-        self.PASS = input('\nEnter your Password\n')
-        with open(location, 'wb') as f:
-            f.write(b64encode(bytes(f'{self.USER}:{self.PASS}',
-                                    'utf-8')))
+    def reauthenticate(self):
+        """
+        This method authenticates the session again, unless another
+        thread already did since the session expired.
+
+        Returns:
+            requests.Response: The response of the query page.
+        """
+        with self.auth_lock:
+            if not self.check_session():
+                self.response = self.authenticate(cert=self.cert)
+                self.authentications += 1
+        return self.response
 
     def __init__(self, *args, **kwargs):
         """
@@ -113,30 +214,65 @@ class GHRS(Query):
             credentials (str): C:\\Python\\vault\\cred.dat Path to  cred.dat,
              containing the user credentials.
 
+            cert (str): Optional path to a CA bundle used to verify
+             the server.
+
+            user (str): Optional user id. When given along with
+             password, the stored credentials are not used.
+
+            password (str): Optional password.
+
         Returns:
                 This method initializes the user credentials by creating
                 new credentials or decrypting the credentials, based on need
                 and acknowledges the session authentication.
         """
-        vault = path.join(environ['systemdrive'] + '\\', 'Python', 'vault')
-        credentials = path.join(vault, 'cred.dat')
         certificate = ''
         if 'cert' in kwargs:
             if path.exists(kwargs['cert']):
                 certificate = kwargs['cert']
-        if path.exists(vault):
-            if path.exists(credentials):
-                with open(credentials, 'rb') as f:
-                    self.USER, self.PASS = b64decode(
-                        f.read()).decode('utf-8').split(':')
-            else:
-                self.store_credentials(credentials)
+        if 'user' in kwargs:
+            self.USER, self.PASS = kwargs['user'], kwargs.get('password', '')
         else:
-            makedirs(vault)
-            self.store_credentials(credentials)
+            self.load_credentials()
+        self.cert = certificate
+        self.auth_lock = threading.Lock()
+        self.authentications = 1
         self.response = self.authenticate(cert = certificate)
         if self.response.status_code == 200:
             print('Session Authenticated!')
         else:
             print('Session Authentication Failed!\n'
                   'Recheck your Credentials and Network')
+
+
+def http_adapter(pool_connections=2, pool_maxsize=16, pool_block=False,
+                 max_retries=2, backoff=0.5):
+    """
+    Returns an HTTPAdapter with a tuned connection pool.
+
+    Failed connections are retried up to max_retries times with an
+    exponential backoff. Requests which reached the server are only
+    retried for idempotent methods, the query posts are retried by
+    Query._download() instead.
+
+    Args:
+        pool_connections (int): Number of hosts whose pools are kept.
+
+        pool_maxsize (int): Connections kept alive per host.
+
+        pool_block (bool): Whether to wait for a free connection when
+        pool_maxsize connections are in use.
+
+        max_retries (int): Retries of failed connections.
+
+        backoff (float): Backoff factor of the retries in seconds.
+
+    Returns:
+        requests.adapters.HTTPAdapter: The adapter to mount.
+    """
+    return HTTPAdapter(pool_connections=pool_connections,
+                       pool_maxsize=pool_maxsize, pool_block=pool_block,
+                       max_retries=Retry(total=max_retries,
+                                         backoff_factor=backoff,
+                                         raise_on_status=False))
@@ -0,0 +1,179 @@
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Metrics():
+    """
+    Class for a hook exposing the samples of ghrs.timing as Prometheus
+    metrics.
+
+    For every phase it counts the samples by outcome, the bytes and
+    the rows, and keeps a latency histogram. The hits and misses of
+    the watched caches are read when the metrics are exposed.
+
+    Usage::
+
+        metrics = Metrics()
+        obj.hooks = [metrics]
+        metrics.watch('memo', obj.memo)
+        metrics.serve(9108)
+    """
+
+    def __init__(self, prefix='ghrs', buckets=BUCKETS):
+        """
+        Constructor Method for Class Metrics.
+
+        Args:
+            prefix (str): Prefix of the metric names.
+
+            buckets (tuple): Upper bounds in seconds of the latency
+            histogram buckets, in increasing order.
+        """
+        self.prefix = prefix
+        self.buckets = tuple(buckets)
+        self.outcomes = {}
+        self.histograms = {}
+        self.bytes = {}
+        self.rows = {}
+        self.caches = {}
+        self.lock = threading.Lock()
+        self.server = None
+
+    def __call__(self, sample):
+        outcome = 'ok' if sample.ok else 'failed'
+        with self.lock:
+            key = (sample.phase, outcome)
+            self.outcomes[key] = self.outcomes.get(key, 0) + 1
+            histogram = self.histograms.get(sample.phase)
+            if histogram is None:
+                histogram = self.histograms[sample.phase] = \
+                    [0] * (len(self.buckets) + 1) + [0.0]
+            histogram[bisect_left(self.buckets, sample.seconds)] += 1
+            histogram[-1] += sample.seconds
+            self.bytes[sample.phase] = \
+                self.bytes.get(sample.phase, 0) + sample.bytes
+            self.rows[sample.phase] = \
+                self.rows.get(sample.phase, 0) + sample.rows
+
+    def watch(self, name, cache):
+        """
+        Exposes the hits and misses attributes of a cache, e.g. a
+        ResultCache, a RangeCache or a MemoryCache. Caches without
+        these attributes are left out.
+
+        Args:
+            name (str): Value of the cache label.
+
+            cache (object): The cache.
+        """
+        self.caches[name] = cache
+
+    def exposition(self):
+        """
+        Returns the metrics in the Prometheus text format.
+        """
+        p = self.prefix
+        lines = []
+
+        def family(name, kind, help, samples):
+            lines.append(f'# HELP {p}_{name} {help}')
+            lines.append(f'# TYPE {p}_{name} {kind}')
+            for suffix, labels, value in samples:
+                labels = ','.join(f'{k}="{v}"' for k, v in labels)
+                labels = f'{{{labels}}}' if labels else ''
+                lines.append(f'{p}_{name}{suffix}{labels} {value}')
+
+        with self.lock:
+            outcomes = sorted(self.outcomes.items())
+            histograms = sorted((k, list(v))
+                                for k, v in self.histograms.items())
+            bytes = sorted(self.bytes.items())
+            rows = sorted(self.rows.items())
+        family('requests_total', 'counter',
+               'Phases of the PeopleSoft queries by outcome.',
+               [('', [('phase', phase), ('outcome', outcome)], value)
+                for (phase, outcome), value in outcomes])
+        samples = []
+        for phase, histogram in histograms:
+            total = 0
+            for bound, count in zip(self.buckets + ('+Inf',), histogram):
+                total += count
+                samples.append(('_bucket', [('phase', phase),
+                                            ('le', bound)], total))
+            samples.append(('_sum', [('phase', phase)], histogram[-1]))
+            samples.append(('_count', [('phase', phase)], total))
+        family('phase_seconds', 'histogram',
+               'Wall time of the phases in seconds.', samples)
+        family('bytes_total', 'counter', 'Bytes received per phase.',
+               [('', [('phase', k)], v) for k, v in bytes if v])
+        family('rows_total', 'counter', 'Rows produced per phase.',
+               [('', [('phase', k)], v) for k, v in rows if v])
+        family('authentications_total', 'counter',
+               'Authentications of the sessions.',
+               [('', [], sum(v for (phase, outcome), v in outcomes
+                             if phase == 'authenticate'))])
+        hits = []
+        misses = []
+        ratios = []
+        for name, cache in sorted(self.caches.items()):
+            if not hasattr(cache, 'hits') or not hasattr(cache, 'misses'):
+                continue
+            hits.append(('', [('cache', name)], cache.hits))
+            misses.append(('', [('cache', name)], cache.misses))
+            lookups = cache.hits + cache.misses
+            ratios.append(('', [('cache', name)],
+                           cache.hits / lookups if lookups else 0))
+        family('cache_hits_total', 'counter', 'Cache hits.', hits)
+        family('cache_misses_total', 'counter', 'Cache misses.', misses)
+        family('cache_hit_ratio', 'gauge',
+               'Ratio of the cache lookups which hit.', ratios)
+        return '\n'.join(lines) + '\n'
+
+    def serve(self, port=9108, host='127.0.0.1'):
+        """
+        Serves the metrics over HTTP from a daemon thread.
+
+        Args:
+            port (int): Port to listen on, 0 for any free port.
+
+            host (str): Address to listen on.
+
+        Returns:
+            http.server.ThreadingHTTPServer: The running server, stopped
+            by close().
+        """
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                body = metrics.exposition().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever,
+                         daemon=True).start()
+        return self.server
+
+    def close(self):
+        """
+        Stops the HTTP server started by serve().
+        """
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
@@ -0,0 +1,318 @@
+from html.parser import HTMLParser
+import xml.etree.ElementTree as ET
+import pandas as pd
+
+
+CHUNK_SIZE = 64 * 1024
+
+
+class FormParser(HTMLParser):
+    """
+    Class for reading the first form of a PeopleSoft page in a single
+    scan, recording only the form action and its named inputs.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.action = None
+        self.data = {}
+        self.in_form = False
+        self.done = False
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        if tag == 'form' and self.action is None:
+            self.action = dict(attrs).get('action') or ''
+            self.in_form = True
+        elif tag == 'input' and self.in_form:
+            attrs = dict(attrs)
+            name = attrs.get('name') or ''
+            if name != '':
+                self.data[name] = attrs.get('value') or ''
+
+    def handle_endtag(self, tag):
+        if tag == 'form' and self.in_form:
+            self.in_form = False
+            self.done = True
+
+
+def read_form(content):
+    """
+    Reads the form of a PeopleSoft page.
+
+    The page is scanned with FormParser, BeautifulSoup is only used
+    when the page is not utf-8 or the scan finds no form.
+
+    Args:
+        content (bytes): HTML content of the page.
+
+    Returns:
+        tuple: (action, data) where action is the url the form posts
+        to and data is a dict of the named input values, or None when
+        the page has no form.
+    """
+    try:
+        parser = FormParser()
+        parser.feed(content.decode('utf-8') if isinstance(content, bytes)
+                    else content)
+        parser.close()
+        if parser.action is not None:
+            return parser.action, parser.data
+    except UnicodeDecodeError:
+        pass
+    return soup_form(content)
+
+
+def soup_form(content):
+    """
+    Reads the form of a PeopleSoft page with BeautifulSoup.
+
+    Args:
+        content (bytes): HTML content of the page.
+
+    Returns:
+        tuple: (action, data) as read_form(), or None.
+    """
+    # Imported on first use, bs4 is only needed as a fallback.
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(content, 'html.parser')
+    if soup.form is None:
+        return None
+    data = {i.attrs.get('name', ''): i.attrs.get('value', '')
+            for i in soup.form.find_all('input')
+            if i.attrs.get('name', '') != ''}
+    return soup.form.attrs.get('action', ''), data
+
+
+class ColumnTarget():
+    """
+    Parser target appending the fields of every <row> element straight
+    to a per column list keyed by tag, without building an element
+    tree.
+
+    With intern, equal field values share a single str object.
+    """
+
+    def __init__(self, intern=False):
+        self.strings = {} if intern else None
+        self.columns = {}
+        self.length = 0
+        self.fields = 0
+        self.in_row = False
+        self.parts = []
+
+    def start(self, tag, attrib):
+        if tag == 'row':
+            self.in_row = True
+            self.fields = 0
+        self.parts = []
+
+    def data(self, data):
+        self.parts.append(data)
+
+    def end(self, tag):
+        if not self.in_row:
+            return
+        length = self.length
+        if tag == 'row':
+            self.in_row = False
+            self.length = length = length + 1
+            if self.fields != len(self.columns):
+                for column in self.columns.values():
+                    if len(column) < length:
+                        column.append(None)
+            return
+        text = ''.join(self.parts) if self.parts else None
+        self.parts = []
+        if self.strings is not None and text is not None:
+            text = self.strings.setdefault(text, text)
+        column = self.columns.get(tag)
+        if column is None:
+            column = self.columns[tag] = [None] * length
+        if len(column) > length:
+            column[-1] = text
+        else:
+            column.append(text)
+            self.fields += 1
+
+    def close(self):
+        return self.columns
+
+
+class RowParser():
+    """
+    Class for incrementally parsing the ICQryDownloadXML response.
+
+    Chunks of the response are fed as they arrive to an expat parser
+    whose target is a ColumnTarget, so memory does not grow with the
+    size of the xml.
+    """
+
+    def __init__(self, intern=False):
+        self.target = ColumnTarget(intern)
+        self.parser = ET.XMLParser(target=self.target)
+
+    def feed(self, chunk):
+        """
+        This method feeds a chunk of the response.
+
+        Args:
+            chunk (bytes): Next chunk of the response.
+
+        Returns:
+            int: Number of rows parsed so far.
+        """
+        self.parser.feed(chunk)
+        return self.target.length
+
+    def close(self):
+        """
+        This method ends the response.
+
+        Returns:
+            dict: Lists of field values keyed by tag.
+        """
+        return self.parser.close()
+
+
+def parse_xml(chunks, intern=False):
+    """
+    Incrementally parses the ICQryDownloadXML response into columns.
+
+    Args:
+        chunks (iterable): Chunks of the response as bytes or str,
+        e.g. requests.Response.iter_content().
+
+        intern (bool): When True, equal field values share a single
+        str object.
+
+    Returns:
+        dict: Lists of field values keyed by tag.
+    """
+    parser = RowParser(intern)
+    for chunk in chunks:
+        parser.feed(chunk)
+    return parser.close()
+
+
+def to_date(series):
+    """
+    Converts a column of YYYY-MM-DD strings into datetime.date objects.
+    """
+    return pd.to_datetime(series, format='%Y-%m-%d').dt.date
+
+
+def to_float(series):
+    """
+    Converts a column of numeric strings into floats.
+    """
+    return pd.to_numeric(series).astype(float)
+
+
+def to_str(series):
+    """
+    Replaces the missing values of a text column by ''.
+    """
+    return series.fillna('')
+
+
+def to_category(series):
+    """
+    Converts a text column into a categorical, replacing the missing
+    values by ''.
+    """
+    return series.fillna('').astype('category')
+
+
+CONVERTERS = {
+    'date': to_date,
+    'float': to_float,
+    'str': to_str,
+    'category': to_category}
+
+
+SCHEMA = {
+    'DUR': 'date',
+    'TL_QUANTITY': 'float',
+    'USER_FIELD_2': 'str',
+    'USER_FIELD_3': 'str',
+    'USER_FIELD_5': 'str'}
+
+
+CATEGORIES = ['EMPLID', 'EMPL_RCD', 'FIRST_NAME', 'LAST_NAME', 'ACCT_CD',
+              'USER_FIELD_2', 'USER_FIELD_3', 'USER_FIELD_5']
+
+
+def compact_schema(schema):
+    """
+    Returns the schema of the compact mode, where the text columns of
+    CATEGORIES are converted into categoricals.
+
+    Args:
+        schema (dict): Schema to start from.
+
+    Returns:
+        dict: The compact schema.
+    """
+    return {**schema, **{name: 'category' for name in CATEGORIES
+                         if schema.get(name, 'str') == 'str'}}
+
+
+def concat(frames):
+    """
+    Concatenates DataFrames returned by to_dataframe(), in order.
+
+    The categories of categorical columns are unified first so the
+    result keeps the categorical dtype.
+
+    Args:
+        frames (list): List of pandas.DataFrame.
+
+    Returns:
+        pandas.DataFrame: The concatenated DataFrame.
+    """
+    frames = [df for df in frames if not df.empty] or frames[:1]
+    if not frames:
+        return pd.DataFrame()
+    if len(frames) == 1:
+        return frames[0].reset_index(drop=True)
+    for name, dtype in frames[0].dtypes.items():
+        if all(isinstance(df[name].dtype, pd.CategoricalDtype)
+               for df in frames if name in df.columns):
+            categories = pd.Index(pd.unique(pd.concat(
+                [pd.Series(df[name].cat.categories) for df in frames
+                 if name in df.columns])))
+            frames = [df.assign(**{name: df[name].cat.set_categories(
+                categories)}) if name in df.columns else df
+                for df in frames]
+    return pd.concat(frames, ignore_index=True)
+
+
+def to_dataframe(columns, schema=None):
+    """
+    Converts the columns of the ICQryDownloadXML response into a
+    DataFrame.
+
+    The columns declared in the schema are converted with the
+    vectorized converter of their type in CONVERTERS. Columns which
+    are not declared are left as text.
+
+    Args:
+        columns (dict): Lists of field values keyed by tag, as returned
+        by parse_xml().
+
+        schema (dict): Optional mapping of column name to a key of
+        CONVERTERS. Defaults to SCHEMA.
+
+    Returns:
+        pandas.DataFrame: Timesheet details, one row per xml row.
+    """
+    df = pd.DataFrame(columns)
+    if df.empty:
+        return df
+    schema = SCHEMA if schema is None else schema
+    df = df.assign(**{
+        name: CONVERTERS[dtype](df[name])
+        for name, dtype in schema.items() if name in df.columns})
+    return df
@@ -0,0 +1,136 @@
+import time
+import threading
+from queue import LifoQueue
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from .ghrs import GHRS, Credentials
+from .query import Query
+
+
+class SessionPool(Query, Credentials):
+    """
+    Class for sharing a pool of authenticated GHRS sessions.
+
+    The sessions are authenticated in parallel up front. Every query
+    borrows one session for the duration of a single PeopleSoft form
+    flow, so the chunks of get_data(chunk=...) and the pairs of
+    get_data_many() run on separate sessions.
+
+    A session idle for longer than max_idle seconds is checked with
+    check_session() before reuse, an expired session is replaced by a
+    newly authenticated one.
+
+    Usage::
+
+        pool = SessionPool(size=8)
+        df, failures = pool.get_data_many(pairs, start_date, end_date,
+                                          max_workers=8)
+    """
+
+    def __init__(self, size=4, max_idle=300, factory=None, **kwargs):
+        """
+        Constructor Method for Class SessionPool.
+
+        Args:
+            size (int): Number of sessions in the pool.
+
+            max_idle (float): Seconds after which an idle session is
+            checked before being reused.
+
+            factory (callable): Optional callable returning a new
+            authenticated session. Defaults to GHRS with the stored
+            credentials.
+
+            kwargs: Passed on to GHRS, e.g. cert.
+        """
+        if factory is None:
+            self.load_credentials()
+            kwargs.update(user=self.USER, password=self.PASS)
+            factory = lambda: GHRS(**kwargs)  # noqa: E731
+        self.factory = factory
+        self.size = size
+        self.max_idle = max_idle
+        self.replaced = 0
+        self.lock = threading.Lock()
+        self.idle = LifoQueue()
+        with ThreadPoolExecutor(max_workers=size) as executor:
+            for member in executor.map(lambda i: self.factory(),
+                                       range(size)):
+                self.idle.put((time.monotonic(), member))
+
+    def _replace(self, member):
+        with self.lock:
+            self.replaced += 1
+        member = self.factory()
+        member.hooks = self.hooks
+        return member
+
+    def _healthy(self, member):
+        if member.response is None or member.response.status_code != 200:
+            return False
+        check = getattr(member, 'check_session', None)
+        return check is None or check()
+
+    def acquire(self):
+        """
+        This method borrows a session from the pool, blocking until
+        one is available.
+
+        Returns:
+            GHRS: An authenticated session.
+        """
+        last_used, member = self.idle.get()
+        if time.monotonic() - last_used > self.max_idle \
+                and not self._healthy(member):
+            try:
+                member = self._replace(member)
+            except BaseException:
+                # keeps the pool size, the expired session is checked
+                # again by the next acquire()
+                self.idle.put((last_used, member))
+                raise
+        member.hooks = self.hooks
+        return member
+
+    def release(self, member):
+        """
+        This method returns a borrowed session to the pool.
+
+        Args:
+            member (GHRS): Session returned by acquire().
+        """
+        self.idle.put((time.monotonic(), member))
+
+    @contextmanager
+    def session(self):
+        """
+        Context manager borrowing a session from the pool.
+        """
+        member = self.acquire()
+        try:
+            yield member
+        finally:
+            self.release(member)
+
+    def _download(self, start_date, end_date,
+                  cost_center, company_code, **kwargs):
+        """
+        This method runs a single range query on a borrowed session.
+
+        When the query fails on a session which turns out to be
+        expired, the session is replaced and the query retried once.
+        When the replacement cannot be authenticated, the expired
+        session goes back to the pool and the error is raised.
+        """
+        member = self.acquire()
+        try:
+            columns = member._download(start_date, end_date, cost_center,
+                                       company_code, **kwargs)
+            if columns is None and not self._healthy(member):
+                member = self._replace(member)
+                columns = member._download(start_date, end_date,
+                                           cost_center, company_code,
+                                           **kwargs)
+            return columns
+        finally:
+            self.release(member)
@@ -1,9 +1,182 @@
-from bs4 import BeautifulSoup
-import xml.etree.ElementTree as ET
-from io import StringIO
+import time
+import random
+from xml.etree.ElementTree import ParseError
+import requests
 import pandas as pd
 from datetime import datetime, date
 from dateutil.relativedelta import relativedelta
+from concurrent.futures import ThreadPoolExecutor
+from .concurrency import pipeline
+from .timing import emit, row_count
+from .parse import (CHUNK_SIZE, SCHEMA, compact_schema, concat, parse_xml,
+                    read_form, to_dataframe)
+
+
+CHUNKS = {
+    'week': relativedelta(weeks=1),
+    'month': relativedelta(months=1),
+    'year': relativedelta(years=1)}
+
+
+def chunk_start(day, chunk):
+    """
+    Returns the first day of the calendar chunk containing day.
+
+    Args:
+        day (date): Any date.
+
+        chunk (str): One of 'week' (ISO week), 'month' or 'year'.
+
+    Returns:
+        date: Monday of the ISO week, first of the month or first of
+        the year.
+    """
+    if chunk == 'week':
+        return day - relativedelta(days=day.weekday())
+    if chunk == 'month':
+        return day.replace(day=1)
+    if chunk == 'year':
+        return day.replace(month=1, day=1)
+    raise ValueError(f'Unknown chunk {chunk!r}, expected one of '
+                     f'{sorted(CHUNKS)}')
+
+
+def week_window(before, after=relativedelta(weeks=4)):
+    """
+    Returns a date range around the Monday of the current ISO week.
+
+    Args:
+        before (relativedelta): Offset of the starting date before
+        the current week.
+
+        after (relativedelta): Offset of the ending date after the
+        current week.
+
+    Returns:
+        tuple: (start_date, end_date)
+    """
+    weekday = datetime.strptime(date.today().strftime("%V %G 1"),
+                                "%V %G %u").date()
+    return weekday - before, weekday + after
+
+
+def backoff_delay(attempt, backoff, max_backoff):
+    """
+    Returns the delay before a retry, an exponential backoff with full
+    jitter.
+
+    Args:
+        attempt (int): Number of the retry, starting at 1.
+
+        backoff (float): Delay of the first retry in seconds.
+
+        max_backoff (float): Upper bound of the delay in seconds.
+
+    Returns:
+        float: A random delay between 0 and
+        min(max_backoff, backoff * 2 ** (attempt - 1)).
+    """
+    return random.uniform(0, min(max_backoff,
+                                 backoff * 2 ** (attempt - 1)))
+
+
+def query_keys(start_date, end_date, cost_center, company_code):
+    """
+    Returns the form fields submitting the query prompt.
+
+    Args:
+        start_date (date): Starting date of the range.
+
+        end_date (date): Ending date of the range.
+
+        cost_center (str): Cost center.
+
+        company_code (str): Company code.
+
+    Returns:
+        dict: Form fields of the #ICOK action.
+    """
+    return {
+        'ICAction': '#ICOK',
+        'InputKeys_bind1': start_date.strftime('%Y/%m/%d'),
+        'InputKeys_bind2': end_date.strftime('%Y/%m/%d'),
+        'InputKeys_ACCT_CD': cost_center,
+        'InputKeys_COMPANY': company_code}
+
+
+def split_days(start_date, end_date, days):
+    """
+    Splits an inclusive date range into chunks of a number of days.
+
+    Returns:
+        list: List of (start, end) date tuples in date order.
+    """
+    ranges = []
+    begin = start_date
+    while begin <= end_date:
+        stop = min(begin + relativedelta(days=days - 1), end_date)
+        ranges.append((begin, stop))
+        begin = stop + relativedelta(days=1)
+    return ranges
+
+
+class OverBudget(Exception):
+    """
+    Raised by counted() when a download exceeds its budget.
+    """
+
+
+def counted(chunks, stats):
+    """
+    Yields chunks while adding up their size in stats['bytes'] and the
+    seconds spent waiting for them in stats['wait'].
+
+    When stats holds a 'max_bytes' size or a 'deadline' in
+    time.perf_counter() seconds, OverBudget is raised as soon as the
+    download goes past it.
+    """
+    stats['bytes'] = 0
+    stats['wait'] = 0
+    max_bytes = stats.get('max_bytes')
+    deadline = stats.get('deadline')
+    chunks = iter(chunks)
+    while True:
+        started = time.perf_counter()
+        chunk = next(chunks, None)
+        stats['wait'] += time.perf_counter() - started
+        if chunk is None:
+            return
+        stats['bytes'] += len(chunk)
+        if max_bytes is not None and stats['bytes'] > max_bytes or \
+                deadline is not None and time.perf_counter() > deadline:
+            raise OverBudget
+        yield chunk
+
+
+def split_date_range(start_date, end_date, chunk):
+    """
+    Splits an inclusive date range into calendar aligned chunks.
+
+    The first and last chunks are clipped to start_date and end_date.
+
+    Args:
+        start_date (date): Starting date of the range.
+
+        end_date (date): Ending date of the range.
+
+        chunk (str): One of 'week', 'month' or 'year'.
+
+    Returns:
+        list: List of (start, end) date tuples in date order.
+    """
+    ranges = []
+    begin = start_date
+    while begin <= end_date:
+        stop = chunk_start(begin, chunk) + CHUNKS[chunk] - \
+            relativedelta(days=1)
+        ranges.append((begin, min(stop, end_date)))
+        begin = stop + relativedelta(days=1)
+    return ranges
 
 
 class Query():
@@ -30,8 +203,66 @@ class Query():
                              - Job Id
                              - Cost_center details
                              - Company code.
+
+    The columns are converted according to the schema attribute, a
+    mapping of column name to a type of ghrs.parse.CONVERTERS, which
+    can be extended per class or per object.
+
+    When the compact attribute is True, the repeated text columns of
+    ghrs.parse.CATEGORIES are returned as pandas categoricals.
+
+    When the cache attribute is a ghrs.cache.ResultCache or RangeCache,
+    get_data() serves the cached data and fetches only what is missing.
+
+    When the memo attribute is a ghrs.cache.MemoryCache, the results of
+    get_data() are memoized in memory by their arguments.
+
+    When the flight attribute is a ghrs.concurrency.SingleFlight,
+    concurrent identical get_data() calls share a single fetch.
+
+    A failed PeopleSoft form flow is retried up to the retries
+    attribute times, with an exponential backoff starting at backoff
+    seconds. An expired session is authenticated again in between.
+
+    With get_data(chunk='adaptive'), ranges which fail or exceed the
+    max_latency or max_response_bytes budgets are bisected, and a good
+    chunk size is learned per pair in the chunk_days attribute. The
+    smallest range which failed per pair is kept in failed_days.
+
+    Every callable of the hooks attribute receives a ghrs.timing.Sample
+    with the wall time, bytes and rows of each phase of get_data().
     """
 
+    schema = SCHEMA
+
+    compact = False
+
+    cache = None
+
+    memo = None
+
+    flight = None
+
+    retries = 3
+
+    backoff = 0.5
+
+    max_backoff = 30
+
+    timeout = None
+
+    adaptive_days = 31
+
+    max_latency = None
+
+    max_response_bytes = None
+
+    chunk_days = None
+
+    failed_days = None
+
+    hooks = ()
+
     def get_recent_data(self, cost_center, company_code):
         """
         This method returns the GHRS data for a 9 week range
@@ -51,10 +282,8 @@ class Query():
               window (4 weeks past and post current week).
 
         """
-        weekday = datetime.strptime(date.today().strftime("%V %G 1"),
-                                    "%V %G %u").date()
-        start_date = weekday - relativedelta(weeks=8)
-        end_date = weekday + relativedelta(weeks=8)
+        start_date, end_date = week_window(relativedelta(weeks=8),
+                                           relativedelta(weeks=8))
         return self.get_data(start_date, end_date, cost_center,
                              company_code)
 
@@ -79,10 +308,7 @@ class Query():
               contains GHRS Timesheet details of the employees for a
               specified month range.
         """
-        weekday = datetime.strptime(date.today().strftime("%V %G 1"),
-                                    "%V %G %u").date()
-        start_date = weekday - relativedelta(weeks=weeks)
-        end_date = weekday + relativedelta(weeks=4)
+        start_date, end_date = week_window(relativedelta(weeks=weeks))
         return self.get_data(start_date, end_date, cost_center,
                              company_code)
 
@@ -106,10 +332,7 @@ class Query():
               contains GHRS Timesheet details of the employees for a
               specified no of months.
         """
-        weekday = datetime.strptime(date.today().strftime("%V %G 1"),
-                                    "%V %G %u").date()
-        start_date = weekday - relativedelta(months=months)
-        end_date = weekday + relativedelta(weeks=4)
+        start_date, end_date = week_window(relativedelta(months=months))
         return self.get_data(start_date, end_date, cost_center,
                              company_code)
 
@@ -132,21 +355,142 @@ class Query():
               contains the GHRS Timesheet details of the employees for
               specified years.
         """
-        weekday = datetime.strptime(date.today().strftime("%V %G 1"),
-                                    "%V %G %u").date()
-        start_date = weekday - relativedelta(year=year)
-        end_date = weekday + relativedelta(weeks=4)
+        start_date, end_date = week_window(relativedelta(years=year))
         return self.get_data(start_date, end_date, cost_center,
                              company_code)
 
+    def get_recent_data_many(self, pairs, **kwargs):
+        """
+        This method returns the GHRS data of get_recent_data() for many
+        (cost_center, company_code) pairs at once.
+
+        Args:
+            pairs (list): List of (cost_center, company_code) tuples.
+
+            kwargs: Passed on to get_data_many().
+
+        Return:
+              tuple: See get_data_many().
+        """
+        start_date, end_date = week_window(relativedelta(weeks=8),
+                                           relativedelta(weeks=8))
+        return self.get_data_many(pairs, start_date, end_date, **kwargs)
+
+    def get_data_many(self, pairs, start_date, end_date, max_workers=8,
+                      combine=True, **kwargs):
+        """
+        This method returns the GHRS data of many (cost_center,
+        company_code) pairs for the same date range.
+
+        The pairs are fetched concurrently. A pair which fails, either
+        by raising or by returning None, is reported in the failures
+        and does not abort the other pairs.
+
+        Args:
+            pairs (list): List of (cost_center, company_code) tuples.
+
+            start_date (date): Starting date for extracting data.
+
+            end_date (date): Ending date for extracting data.
+
+            max_workers (int): Maximum number of pairs fetched at the
+            same time.
+
+            combine (bool): When True the DataFrames are concatenated
+            in the order of pairs, with an added COMPANY column.
+            Otherwise a dict keyed by pair is returned.
+
+            kwargs: Passed on to get_data(), e.g. chunk.
+
+        Return:
+              tuple: (data, failures) where data is a pandas.DataFrame
+              or a dict of pandas.DataFrame keyed by pair, and failures
+              is a dict of error messages keyed by pair.
+        """
+        pairs = list(dict.fromkeys(tuple(p) for p in pairs))
+
+        def fetch(pair):
+            try:
+                return self.get_data(start_date, end_date, *pair, **kwargs)
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = dict(zip(pairs, executor.map(fetch, pairs)))
+        failures = {}
+        data = {}
+        for pair, result in results.items():
+            if result is None:
+                failures[pair] = 'No data returned'
+            elif isinstance(result, Exception):
+                failures[pair] = f'{type(result).__name__}: {result}'
+            else:
+                data[pair] = result
+        if not combine:
+            return data, failures
+        frames = [df.assign(COMPANY=pair[1]) for pair, df in data.items()
+                  if not df.empty]
+        if not frames:
+            return pd.DataFrame(), failures
+        return concat(frames), failures
+
+    def sync(self, cost_center, company_code, store,
+             start_date=date(2017, 1, 1), window=relativedelta(weeks=4),
+             chunk='month'):
+        """
+        This method incrementally mirrors the GHRS data of a pair into
+        a store, e.g. a ghrs.store.SQLiteStore.
+
+        The first sync pulls from start_date. Later syncs only pull the
+        correction window before the watermark, the last synced date,
+        up to 4 weeks after the current week, and upsert the rows by
+        their natural key.
+
+        Args:
+            cost_center (str): Cost center.
+
+            company_code (str): Company code.
+
+            store (SQLiteStore): Store of the mirrored rows.
+
+            start_date (date): Starting date of the first sync. Timesheet
+            data is available from 2017.
+
+            window (relativedelta): Correction window pulled again
+            before the watermark.
+
+            chunk (str): Chunk size of the pull, see get_data().
+
+        Return:
+              int: Number of rows upserted, or None when the pull
+              failed, in which case the watermark is not advanced.
+        """
+        watermark = store.watermark(cost_center, company_code)
+        if watermark is not None:
+            start_date = min(watermark, date.today()) - window
+        _, end_date = week_window(relativedelta(weeks=0))
+        df = self.get_data(start_date, end_date, cost_center, company_code,
+                           chunk=chunk)
+        if df is None:
+            return None
+        return store.upsert(cost_center, company_code, df, start_date,
+                            end_date)
+
     def get_data(self, start_date, end_date,
-                 cost_center, company_code):
+                 cost_center, company_code, chunk=None, max_workers=4):
         """
-        This method scraps the html content using
-        BeautifulSoup when the response staus code is 200.
+        This method submits the PeopleSoft query form, scanned with
+        ghrs.parse.FormParser, when the response status code is 200.
+
+        The data is downloaded as xml, parsed while it streams in by
+        ghrs.parse.parse_xml() and converted into a DataFrame.
 
-        The scrapped data is downloaded as xml and
-        parsed using xml.etree and converted as a DataFrame.
+        When chunk is given, the date range is split into calendar
+        aligned chunks which are fetched concurrently and concatenated
+        back in date order.
+
+        When a cache is set, the cached data is served from it and
+        only the missing sub ranges are fetched.
 
         Args:
             start_date (date): A date object which specifies the
@@ -161,60 +505,376 @@ class Query():
             company_code (str): A string object which specifies the
             company code.
 
+            chunk (str): Optional, one of 'week', 'month' or 'year'.
+            Splits the date range into chunks of the given size.
+            'adaptive' splits it into chunks of the size learned for
+            the pair and bisects chunks which fail.
+
+            max_workers (int): Maximum number of chunks fetched at the
+            same time. Only used along with chunk.
+
         Return:
               pandas.DataFrame: Returns a DataFrame object which
               contains the Timesheet details of the employees on
               specified timerange.
 
         """
+        started = time.perf_counter()
+        df = self._get_memo_or_flight(start_date, end_date, cost_center,
+                                      company_code, chunk, max_workers)
+        self._emit('get_data', started, rows=0 if df is None else len(df),
+                   ok=df is not None)
+        return df
+
+    def _get_memo_or_flight(self, start_date, end_date, cost_center,
+                            company_code, chunk, max_workers):
+        """
+        This method answers get_data() from the memo when it holds the
+        range, otherwise fetches it, through the single flight if any.
+        """
+        key = (start_date, end_date, cost_center, company_code,
+               self.compact)
+        if self.memo is not None:
+            df = self.memo.get(key)
+            if df is not None:
+                return df
+        if self.flight is not None:
+            return self.flight.do(key, lambda: self._get_memoized_data(
+                key, chunk, max_workers))
+        return self._get_memoized_data(key, chunk, max_workers)
+
+    def _get_memoized_data(self, key, chunk, max_workers):
+        df = self._get_uncached_data(*key[:4], chunk, max_workers)
+        if self.memo is not None and df is not None:
+            df = self.memo.put(key, df)
+        return df
+
+    def _get_uncached_data(self, start_date, end_date, cost_center,
+                           company_code, chunk, max_workers):
+        if self.cache is not None and start_date <= end_date:
+            return self._get_cached_data(start_date, end_date, cost_center,
+                                         company_code, chunk, max_workers)
+        return self._get_data(start_date, end_date, cost_center,
+                              company_code, chunk, max_workers)
+
+    def _get_cached_data(self, start_date, end_date, cost_center,
+                         company_code, chunk, max_workers):
+        """
+        This method answers get_data() from the cache, fetching only
+        the sub ranges which the cache does not cover.
+        """
+        key = (cost_center, company_code, self.compact)
+        for start, end in self.cache.gaps(key, start_date, end_date):
+            df = self._get_data(start, end, cost_center, company_code,
+                                chunk, max_workers)
+            if df is None:
+                return None
+            self.cache.store(key, start, end, df)
+        return self.cache.read(key, start_date, end_date)
+
+    def _get_data(self, start_date, end_date, cost_center,
+                  company_code, chunk, max_workers):
+        """
+        This method fetches a date range from PeopleSoft, see
+        get_data().
+        """
+        if chunk is None or start_date > end_date:
+            return self._fetch_data(start_date, end_date, cost_center,
+                                    company_code)
+        if chunk == 'adaptive':
+            days = self.learned_chunk_days(cost_center, company_code)
+            ranges = split_days(start_date, end_date, days)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                frames = list(executor.map(
+                    lambda r: self._fetch_adaptive(r[0], r[1], cost_center,
+                                                   company_code),
+                    ranges))
+        else:
+            frames = list(self._pipeline(
+                split_date_range(start_date, end_date, chunk), cost_center,
+                company_code, depth=max_workers, workers=max_workers))
+        if any(df is None for df in frames):
+            return None
+        return concat(frames)
+
+    def learned_chunk_days(self, cost_center, company_code):
+        """
+        Returns the chunk size in days learned by the adaptive mode for
+        a pair, adaptive_days when nothing was learned yet.
+        """
+        if self.chunk_days is None:
+            self.chunk_days = {}
+        if self.failed_days is None:
+            self.failed_days = {}
+        return self.chunk_days.get((cost_center, company_code),
+                                   self.adaptive_days)
+
+    def _fetch_adaptive(self, start_date, end_date, cost_center,
+                        company_code):
+        """
+        This method fetches a date range in the adaptive mode.
+
+        A multi-day range which fails on a live session, or whose
+        response exceeds the max_latency or max_response_bytes budgets,
+        is split in half and each half fetched again, recursively down
+        to single days. The download is aborted as soon as it goes over
+        a budget. On an expired session, _download() authenticates
+        again and fetches the range again first.
+
+        The learned chunk size of the pair shrinks on failures and on
+        responses over the budgets, and grows again on responses well
+        within the budgets. Without budgets, it grows back up to
+        adaptive_days, short of the smallest range which failed.
+        """
+        key = (cost_center, company_code)
+        days = (end_date - start_date).days + 1
+        stats = {}
+        started = time.perf_counter()
+        if days > 1 and self.max_response_bytes:
+            stats['max_bytes'] = self.max_response_bytes
+        if days > 1 and self.max_latency:
+            stats['deadline'] = started + self.max_latency
+        columns = self._download(start_date, end_date, cost_center,
+                                 company_code,
+                                 retries=0 if days > 1 else None,
+                                 stats=stats, renew=True)
+        usage = max(
+            (time.perf_counter() - started) / self.max_latency
+            if self.max_latency else 0,
+            stats.get('bytes', 0) / self.max_response_bytes
+            if self.max_response_bytes else 0)
+        learned = self.learned_chunk_days(cost_center, company_code)
+        if days > 1 and (columns is None or usage > 1):
+            self.failed_days[key] = min(self.failed_days.get(key, days),
+                                        days)
+            self.chunk_days[key] = min(learned, days // 2)
+            return self._bisect(start_date, end_date, cost_center,
+                                company_code)
+        if columns is None:
+            return None
+        if usage > 1:
+            self.chunk_days[key] = 1
+        elif 0 < usage < 0.25 and days >= learned:
+            self.chunk_days[key] = min(366, days * 2)
+        elif not (self.max_latency or self.max_response_bytes) \
+                and days >= learned:
+            self.chunk_days[key] = max(learned, min(
+                self.adaptive_days, days * 2,
+                self.failed_days.get(key, days * 2 + 1) - 1))
+        return self._to_dataframe(columns)
+
+    def _bisect(self, start_date, end_date, cost_center, company_code):
+        """
+        This method fetches the two halves of a date range in the
+        adaptive mode and concatenates them.
+        """
+        days = (end_date - start_date).days + 1
+        middle = start_date + relativedelta(days=days // 2 - 1)
+        frames = [self._fetch_adaptive(start, end, cost_center,
+                                       company_code)
+                  for start, end in [(start_date, middle),
+                                     (middle + relativedelta(days=1),
+                                      end_date)]]
+        if any(df is None for df in frames):
+            return None
+        return concat(frames)
+
+    def iter_data(self, start_date, end_date, cost_center, company_code,
+                  chunk='month', prefetch=1):
+        """
+        This method yields the GHRS data of a date range one calendar
+        aligned chunk at a time, as soon as each chunk is downloaded,
+        so memory does not grow with the length of the range.
+
+        The next chunks are downloaded in the background while the
+        caller processes the current one.
+
+        Args:
+            start_date (date): Starting date for extracting data.
+
+            end_date (date): Ending date for extracting data.
+
+            cost_center (str): Cost center.
+
+            company_code (str): Company code.
+
+            chunk (str): One of 'week', 'month' or 'year'.
+
+            prefetch (int): Number of chunks downloaded ahead while the
+            caller processes the current one, 0 to download a chunk
+            only when it is requested.
+
+        Yields:
+              pandas.DataFrame: Timesheet details of a chunk, in date
+              order, or None for a chunk which failed.
+        """
+        yield from self._pipeline(
+            split_date_range(start_date, end_date, chunk), cost_center,
+            company_code, depth=prefetch)
+
+    def _pipeline(self, ranges, cost_center, company_code, depth=1,
+                  workers=1):
+        """
+        This method downloads date ranges in background threads and
+        converts them to DataFrames in the calling thread, so the next
+        ranges are downloading while the current one is normalized.
+
+        At most depth downloaded ranges wait for their conversion.
+
+        Yields:
+              pandas.DataFrame: Timesheet details of each range, in
+              order, or None for a range which failed.
+        """
+        for columns in pipeline(
+                lambda r: self._download(r[0], r[1], cost_center,
+                                         company_code),
+                ranges, depth=depth, workers=workers):
+            yield None if columns is None else self._to_dataframe(columns)
+
+    def _fetch_data(self, start_date, end_date,
+                    cost_center, company_code):
+        """
+        This method drives the PeopleSoft query form for a single
+        date range and returns the Timesheet details as a DataFrame.
+
+        Args:
+            start_date (date): Starting date of the range.
+
+            end_date (date): Ending date of the range.
+
+            cost_center (str): Cost center.
+
+            company_code (str): Company code.
+
+        Return:
+              pandas.DataFrame: Timesheet details of the range, or None
+              when any of the PeopleSoft hops fails.
+        """
+        columns = self._download(start_date, end_date, cost_center,
+                                 company_code)
+        if columns is None:
+            return None
+        return self._to_dataframe(columns)
+
+    def _to_dataframe(self, columns):
+        started = time.perf_counter()
+        schema = compact_schema(self.schema) if self.compact \
+            else self.schema
+        df = to_dataframe(columns, schema)
+        self._emit('convert', started, rows=len(df))
+        return df
+
+    def _download(self, start_date, end_date, cost_center, company_code,
+                  retries=None, stats=None, renew=False):
+        """
+        This method drives the PeopleSoft query form for a single
+        date range and parses the downloaded xml.
+
+        A failed attempt is retried up to retries times, after an
+        exponential backoff with full jitter. When check_session()
+        reports the session as expired, reauthenticate() is called
+        before the next attempt.
+
+        Args:
+            retries (int): Optional number of retries, defaults to the
+            retries attribute.
+
+            stats (dict): Optional dict in which the size of the xml
+            is recorded as 'bytes'.
+
+            renew (bool): Whether a last attempt which failed on an
+            expired session is followed by reauthenticate() and one
+            more attempt, even without retries left.
+
+        Return:
+              dict: Lists of field values keyed by tag, or None when
+              any of the PeopleSoft hops still fails after the retries.
+        """
+        retries = self.retries if retries is None else retries
+        for attempt in range(retries + 1):
+            if attempt:
+                time.sleep(backoff_delay(attempt, self.backoff,
+                                         self.max_backoff))
+            started = time.perf_counter()
+            try:
+                columns = self._download_once(start_date, end_date,
+                                              cost_center, company_code,
+                                              stats)
+            except (requests.RequestException, ParseError, OverBudget):
+                columns = None
+            self._emit('query', started, ok=columns is not None)
+            if columns is not None:
+                return columns
+            if attempt < retries and not self.check_session():
+                self.reauthenticate()
+        if renew and not self.check_session():
+            self.reauthenticate()
+            return self._download(start_date, end_date, cost_center,
+                                  company_code, retries=0, stats=stats)
+        return None
+
+    def _download_once(self, start_date, end_date,
+                       cost_center, company_code, stats=None):
         if self.response.status_code == 200:
-            soup = BeautifulSoup(self.response.content, 'html.parser')
-            if soup.form is None:
+            form = self._read_form(self.response.content)
+            if form is None:
                 return None
-            data = {i.attrs.get('name', ''): i.attrs.get('value', '')
-                    for i in soup.form.find_all('input')
-                    if i.attrs.get('name', '') != ''}
-            data.update({
-                'ICAction': '#ICOK',
-                'InputKeys_bind1': start_date.strftime('%Y/%m/%d'),
-                'InputKeys_bind2': end_date.strftime('%Y/%m/%d'),
-                'InputKeys_ACCT_CD': cost_center,
-                'InputKeys_COMPANY': company_code})
-            response = self.session.post(
-                soup.form.attrs.get('action', ''),
-                data=data,
-                headers=self.header)
+            action, data = form
+            data.update(query_keys(start_date, end_date, cost_center,
+                                   company_code))
+            started = time.perf_counter()
+            response = self.session.post(action, data=data,
+                                         headers=self.header,
+                                         timeout=self.timeout)
+            self._emit('submit', started, len(response.content),
+                       ok=response.status_code == 200)
             if response.status_code != 200:
                 return None
-            soup = BeautifulSoup(response.content, 'html.parser')
-            if soup.form is None:
+            form = self._read_form(response.content)
+            if form is None:
                 return None
-            data = {i.attrs.get('name', ''): i.attrs.get('value', '')
-                    for i in soup.form.find_all('input')
-                    if i.attrs.get('name', '') != ''}
+            action, data = form
             data.update({'ICAction': '#ICQryDownloadXML'})
-            response = self.session.post(
-                soup.form.attrs.get('action', ''),
-                data=data,
-                headers=self.header)
-            if response.status_code != 200:
-                return None
-            df = pd.DataFrame([
-                {i.tag: i.text for i in r.iter() if i.tag != 'row'}
-                for r in ET.parse(StringIO(response.text)).iter('row')])
-            if not df.empty:
-                df['DUR'] = [datetime.strptime(i, '%Y-%m-%d').date()
-                    for i in df['DUR'].values]
-                df['TL_QUANTITY'] = [float(i)
-                    for i in df['TL_QUANTITY'].values]
-                df['USER_FIELD_2'] = ['' if i is None else i
-                    for i in df['USER_FIELD_2'].values]
-                df['USER_FIELD_3'] = ['' if i is None else i
-                    for i in df['USER_FIELD_3'].values]
-                df['USER_FIELD_5'] = ['' if i is None else i
-                    for i in df['USER_FIELD_5'].values]
-            return df
-
+            started = time.perf_counter()
+            response = self.session.post(action, data=data,
+                                         headers=self.header, stream=True,
+                                         timeout=self.timeout)
+            try:
+                if response.status_code != 200:
+                    self._emit('download', started, ok=False)
+                    return None
+                chunks = response.iter_content(CHUNK_SIZE)
+                if stats is None and self.hooks:
+                    stats = {}
+                if stats is not None:
+                    chunks = counted(chunks, stats)
+                parsing = time.perf_counter()
+                columns = parse_xml(chunks, intern=self.compact)
+                if self.hooks:
+                    parsed = time.perf_counter()
+                    emit(self.hooks, 'download',
+                         parsing - started + stats['wait'], stats['bytes'])
+                    emit(self.hooks, 'parse_xml',
+                         parsed - parsing - stats['wait'],
+                         rows=row_count(columns))
+                return columns
+            finally:
+                response.close()
+
+    def _read_form(self, content):
+        started = time.perf_counter()
+        form = read_form(content)
+        self._emit('read_form', started, len(content))
+        return form
+
+    def _emit(self, phase, started, bytes=0, rows=0, ok=True):
+        """
+        This method reports a phase which started at started to the
+        hooks, if any.
+        """
+        if self.hooks:
+            emit(self.hooks, phase, time.perf_counter() - started, bytes,
+                 rows, ok)
 
     def summarize_by_week(self, df):
         """
@@ -233,11 +893,14 @@ class Query():
         df_summary.set_index(
             pd.DatetimeIndex(pd.to_datetime(df_summary['DUR'])),
             inplace=True)
+        for name in df_summary.select_dtypes('category'):
+            if '' not in df_summary[name].cat.categories:
+                df_summary[name] = df_summary[name].cat.add_categories('')
         df_summary.fillna("", inplace=True)
         df_summary.drop("DUR", axis=1, inplace=True)
         df_summary = df_summary.groupby(
             ['EMPLID', 'EMPL_RCD', 'FIRST_NAME', 'LAST_NAME', 'ACCT_CD',
-            'USER_FIELD_2', 'USER_FIELD_3', 'USER_FIELD_5']
+            'USER_FIELD_2', 'USER_FIELD_3', 'USER_FIELD_5'], observed=True
             ).resample('W-MON', "DUR", closed='left', label='left').sum()
         df_summary.reset_index(inplace=True)
         df_summary["DUR"] = df_summary["DUR"].apply(lambda x: x.date())
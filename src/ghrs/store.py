@@ -0,0 +1,140 @@
+import sqlite3
+from contextlib import closing
+from datetime import date
+import pandas as pd
+
+
+KEY = ['EMPLID', 'EMPL_RCD', 'DUR', 'USER_FIELD_2', 'USER_FIELD_3',
+       'USER_FIELD_5']
+
+COLUMNS = ['EMPLID', 'EMPL_RCD', 'FIRST_NAME', 'LAST_NAME', 'ACCT_CD',
+           'DUR', 'TL_QUANTITY', 'USER_FIELD_2', 'USER_FIELD_3',
+           'USER_FIELD_5']
+
+
+class SQLiteStore():
+    """
+    Class for keeping a local SQLite mirror of GHRS timesheets.
+
+    Rows are stored per (cost_center, company_code) pair and are unique
+    by their natural key, KEY. The last synced date of every pair is
+    kept as its watermark.
+    """
+
+    def __init__(self, path):
+        """
+        Constructor Method for Class SQLiteStore.
+
+        Args:
+            path (str): Path to the SQLite database, created if needed.
+        """
+        self.path = path
+        key = ', '.join(['COST_CENTER', 'COMPANY'] + KEY)
+        with closing(self.connect()) as connection, connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS timesheets ('
+                'COST_CENTER TEXT NOT NULL, COMPANY TEXT NOT NULL, '
+                + ', '.join(f'{name} {self.column_type(name)}'
+                            for name in COLUMNS)
+                + f', PRIMARY KEY ({key}))')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS watermarks ('
+                'COST_CENTER TEXT NOT NULL, COMPANY TEXT NOT NULL, '
+                'SYNCED TEXT NOT NULL, PRIMARY KEY (COST_CENTER, COMPANY))')
+
+    @staticmethod
+    def column_type(name):
+        return 'REAL' if name == 'TL_QUANTITY' else 'TEXT'
+
+    def connect(self):
+        return sqlite3.connect(self.path)
+
+    def watermark(self, cost_center, company_code):
+        """
+        Returns the last synced date of a pair.
+
+        Returns:
+            date: The watermark, or None when the pair was never synced.
+        """
+        with closing(self.connect()) as connection:
+            row = connection.execute(
+                'SELECT SYNCED FROM watermarks WHERE COST_CENTER = ? '
+                'AND COMPANY = ?', (cost_center, str(company_code))
+            ).fetchone()
+        return None if row is None else date.fromisoformat(row[0])
+
+    def upsert(self, cost_center, company_code, df, start_date, end_date):
+        """
+        Upserts the rows of a pulled date range by natural key and
+        advances the watermark of the pair, in one transaction.
+
+        Rows of the range which are no longer returned by GHRS are
+        deleted, so corrections made upstream are mirrored.
+
+        Args:
+            cost_center (str): Cost center.
+
+            company_code (str): Company code.
+
+            df (pandas.DataFrame): Timesheet details of the range.
+
+            start_date (date): Starting date of the pulled range.
+
+            end_date (date): Ending date of the pulled range, stored
+            as the new watermark.
+
+        Returns:
+            int: Number of rows upserted.
+        """
+        company_code = str(company_code)
+        records = []
+        if not df.empty:
+            df = df.reindex(columns=COLUMNS).astype(object)
+            df['DUR'] = [None if pd.isna(i) else i.isoformat()
+                         for i in df['DUR']]
+            df = df.where(df.notna(), None)
+            records = [(cost_center, company_code) + tuple(row)
+                       for row in df.itertuples(index=False)]
+        with closing(self.connect()) as connection, connection:
+            connection.execute(
+                'DELETE FROM timesheets WHERE COST_CENTER = ? AND '
+                'COMPANY = ? AND DUR BETWEEN ? AND ?',
+                (cost_center, company_code, start_date.isoformat(),
+                 end_date.isoformat()))
+            connection.executemany(
+                'INSERT OR REPLACE INTO timesheets (COST_CENTER, COMPANY, '
+                + ', '.join(COLUMNS) + ') VALUES ('
+                + ', '.join('?' * (len(COLUMNS) + 2)) + ')', records)
+            connection.execute(
+                'INSERT OR REPLACE INTO watermarks VALUES (?, ?, ?)',
+                (cost_center, company_code, end_date.isoformat()))
+        return len(records)
+
+    def read(self, cost_center, company_code, start_date=None,
+             end_date=None):
+        """
+        Reads the mirrored rows of a pair.
+
+        Args:
+            cost_center (str): Cost center.
+
+            company_code (str): Company code.
+
+            start_date (date): Optional starting date.
+
+            end_date (date): Optional ending date.
+
+        Returns:
+            pandas.DataFrame: Timesheet details ordered by DUR.
+        """
+        start_date = start_date or date.min
+        end_date = end_date or date.max
+        with closing(self.connect()) as connection:
+            df = pd.read_sql_query(
+                'SELECT ' + ', '.join(COLUMNS) + ' FROM timesheets WHERE '
+                'COST_CENTER = ? AND COMPANY = ? AND DUR BETWEEN ? AND ? '
+                'ORDER BY DUR, EMPLID', connection,
+                params=(cost_center, str(company_code),
+                        start_date.isoformat(), end_date.isoformat()))
+        df['DUR'] = [date.fromisoformat(i) for i in df['DUR']]
+        return df
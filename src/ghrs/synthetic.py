@@ -0,0 +1,253 @@
+from datetime import timedelta
+from html import escape
+import numpy as np
+import pandas as pd
+from .parse import SCHEMA, compact_schema, to_dataframe
+
+
+FIELDS = ['EMPLID', 'EMPL_RCD', 'FIRST_NAME', 'LAST_NAME', 'ACCT_CD', 'DUR',
+          'TL_QUANTITY', 'USER_FIELD_2', 'USER_FIELD_3', 'USER_FIELD_5']
+
+NULL_RATES = {'USER_FIELD_3': 0.5, 'USER_FIELD_5': 0.05}
+
+QUANTITIES = ['8', '8', '8', '8', '4', '10', '2.5']
+
+ACTIVITIES = 20
+
+JOB_SHARES = [0.9, 0.07, 0.03]
+
+BLOCK = 2 ** 16
+
+
+class Timesheets():
+    """
+    Class for generating synthetic GHRS timesheets, shaped like the
+    ICQryDownloadXML response, as xml or as a DataFrame.
+
+    Every employee books one row per day on a cost center. The job
+    code of a row is the main job of the employee 90% of the time, or
+    one of two secondary jobs, each with its activity code. The rows
+    are ordered by day then employee. The random values of a row only
+    depend on seed and on its position, so any slice of the rows is
+    the same in the xml and in the DataFrame.
+
+    The rows are generated in vectorized blocks, the xml is streamed in
+    chunks, so tens of millions of rows can be generated with a bounded
+    memory.
+
+    Usage::
+
+        data = Timesheets(date(2020,1,1), date(2021,12,31), employees=5000,
+                          cost_centers=['F94170', 'F94171'], jobs=300)
+        columns = parse_xml(data.xml_chunks())
+        df = data.dataframe(compact=True)
+    """
+
+    def __init__(self, start_date, end_date, employees=100,
+                 cost_centers=('F94170',), jobs=40, null_rates=None,
+                 weekends=True, seed=0):
+        """
+        Constructor Method for Class Timesheets.
+
+        Args:
+            start_date (date): First day of the timesheets.
+
+            end_date (date): Last day of the timesheets.
+
+            employees (int): Number of employees.
+
+            cost_centers (list): Cost centers, employees are spread
+            evenly over them.
+
+            jobs (int): Number of distinct USER_FIELD_2 job codes.
+
+            null_rates (dict): Probability of a missing value keyed by
+            field. Defaults to NULL_RATES.
+
+            weekends (bool): When False, no rows are booked on
+            Saturdays and Sundays.
+
+            seed (int): Seed of the random values.
+        """
+        days = [start_date + timedelta(days=i)
+                for i in range((end_date - start_date).days + 1)]
+        if not weekends:
+            days = [day for day in days if day.weekday() < 5]
+        self.days = np.array(days, dtype=object)
+        self.employees = employees
+        self.cost_centers = list(cost_centers)
+        self.jobs = jobs
+        self.null_rates = NULL_RATES if null_rates is None else null_rates
+        self.seed = seed
+        self.rows = len(self.days) * employees
+        ids = np.arange(employees)
+        self.values = {
+            'EMPLID': strings(1000000 + ids),
+            'EMPL_RCD': np.array(['0'], dtype=object),
+            'FIRST_NAME': strings(ids, 'First'),
+            'LAST_NAME': strings(ids, 'Last'),
+            'ACCT_CD': np.array(self.cost_centers, dtype=object),
+            'DUR': np.array([day.isoformat() for day in self.days],
+                            dtype=object),
+            'TL_QUANTITY': np.array(QUANTITIES, dtype=object),
+            'USER_FIELD_2': strings(np.arange(jobs), 'J', 5),
+            'USER_FIELD_3': strings(np.arange(ACTIVITIES), 'A', 3),
+            'USER_FIELD_5': np.array(['X', 'Y'], dtype=object)}
+
+    def indices(self, start, stop):
+        """
+        Returns the index in self.values of every field of a slice of
+        rows, -1 for a missing value.
+
+        Returns:
+            dict: Arrays of indices keyed by field.
+        """
+        parts = [self.block(b)
+                 for b in range(start // BLOCK, (stop - 1) // BLOCK + 1)]
+        offset = start - start // BLOCK * BLOCK
+        return {name: np.concatenate([p[name] for p in parts])
+                [offset:offset + stop - start] for name in FIELDS}
+
+    def block(self, number):
+        start = number * BLOCK
+        rows = np.arange(start, min(start + BLOCK, self.rows))
+        rng = np.random.default_rng([self.seed, number])
+        employee = rows % self.employees
+        job = np.searchsorted(np.cumsum(JOB_SHARES),
+                              rng.random(len(rows)), side='right')
+        index = {
+            'EMPLID': employee,
+            'EMPL_RCD': np.zeros(len(rows), dtype=np.int64),
+            'FIRST_NAME': employee,
+            'LAST_NAME': employee,
+            'ACCT_CD': employee % len(self.cost_centers),
+            'DUR': rows // self.employees,
+            'TL_QUANTITY': rng.integers(0, len(QUANTITIES), len(rows)),
+            'USER_FIELD_2': (employee * 7919 + job * 104729) % self.jobs,
+            'USER_FIELD_3': (employee + job) % ACTIVITIES,
+            'USER_FIELD_5': employee % 2}
+        for name, rate in self.null_rates.items():
+            if rate:
+                index[name] = np.where(rng.random(len(rows)) < rate, -1,
+                                       index[name])
+        return index
+
+    def columns(self, start=0, stop=None):
+        """
+        Returns a slice of rows as the text columns parse_xml() returns,
+        with None for the missing values.
+
+        Args:
+            start (int): First row.
+
+            stop (int): Row after the last one, defaults to all rows.
+
+        Returns:
+            dict: Object arrays of field values keyed by tag.
+        """
+        stop = self.rows if stop is None else min(stop, self.rows)
+        if start >= stop:
+            return {name: np.array([], dtype=object) for name in FIELDS}
+        return {name: take(self.values[name], index)
+                for name, index in self.indices(start, stop).items()}
+
+    def xml_chunks(self, rows=BLOCK):
+        """
+        Yields the ICQryDownloadXML response in chunks.
+
+        Args:
+            rows (int): Number of rows per chunk.
+
+        Yields:
+            bytes: The next chunk of the xml document.
+        """
+        yield (f'<?xml version="1.0"?><query numrows="{self.rows}">'
+               ).encode('utf-8')
+        elements = {name: np.array(
+            [f'<{name}>{escape(value)}</{name}>' for value in values]
+            + [f'<{name}/>'], dtype=object)
+            for name, values in self.values.items()}
+        for start in range(0, self.rows, rows):
+            stop = min(start + rows, self.rows)
+            index = self.indices(start, stop)
+            xml = np.char.add('<row rownumber="', np.arange(
+                start + 1, stop + 1).astype(str)).astype(object) + '">'
+            for name in FIELDS:
+                xml += elements[name][index[name]]
+            yield (''.join(xml + '</row>')).encode('utf-8')
+        yield b'</query>'
+
+    def xml(self):
+        """
+        Returns the whole ICQryDownloadXML response.
+        """
+        return b''.join(self.xml_chunks())
+
+    def dataframe(self, compact=False, schema=SCHEMA):
+        """
+        Returns the rows as get_data() would, without going through the
+        xml.
+
+        Args:
+            compact (bool): Whether to convert the text columns into
+            categoricals, as in compact mode.
+
+            schema (dict): Schema of the columns.
+
+        Returns:
+            pandas.DataFrame: The timesheet details.
+        """
+        schema = compact_schema(schema) if compact else schema
+        if not self.rows:
+            return to_dataframe(self.columns(), schema)
+        index = self.indices(0, self.rows)
+        typed = {}
+        if schema.get('DUR') == 'date':
+            typed['DUR'] = take(self.days, index['DUR'])
+        if schema.get('TL_QUANTITY') == 'float':
+            typed['TL_QUANTITY'] = take(np.array(QUANTITIES, dtype=float),
+                                        index['TL_QUANTITY'], np.nan)
+        for name in FIELDS:
+            if schema.get(name) == 'category':
+                typed[name] = categorical(self.values[name], index[name])
+        return to_dataframe(
+            {name: typed[name] if name in typed
+             else take(self.values[name], index[name]) for name in FIELDS},
+            {name: dtype for name, dtype in schema.items()
+             if name not in typed})
+
+
+def categorical(values, index):
+    """
+    Returns values[index] as the categorical to_category() would make,
+    with '' where index is -1, straight from the codes.
+    """
+    used = np.unique(index)
+    labels = list(values[used[used >= 0]]) + ([''] if used[0] < 0 else [])
+    order = np.argsort(labels, kind='stable')
+    categories = [labels[i] for i in order]
+    codes = np.empty(len(values) + 1, dtype=np.int64)
+    codes[np.append(used[used >= 0], -1)[:len(labels)]] = \
+        np.argsort(order)
+    return pd.Categorical.from_codes(codes[index], categories)
+
+
+def strings(numbers, prefix='', width=0):
+    """
+    Returns an object array of prefixed, zero padded numbers.
+    """
+    return np.array([f'{prefix}{i:0{width}d}' for i in numbers],
+                    dtype=object)
+
+
+def take(values, index, missing=None):
+    """
+    Returns values[index] with missing where index is -1.
+    """
+    out = values[index]
+    if (index < 0).any():
+        if out.dtype == object:
+            out[index < 0] = missing
+        else:
+            out = np.where(index < 0, missing, out)
+    return out
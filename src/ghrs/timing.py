@@ -0,0 +1,104 @@
+import threading
+from collections import namedtuple
+import pandas as pd
+
+
+# A hook is a callable receiving a Sample for every timed phase:
+#
+#   authenticate: the redirect chain of GHRS.authenticate()
+#   read_form:    reading the fields of a PeopleSoft form page
+#   submit:       the #ICOK post of the query prompt
+#   download:     the #ICQryDownloadXML post and the wait for its chunks
+#   parse_xml:    parsing the downloaded chunks into columns
+#   convert:      the schema conversions into a DataFrame
+#   query:        one attempt of the whole form flow, per retry
+#   get_data:     a whole get_data() call
+#
+# ok is False for a phase which failed.
+
+Sample = namedtuple('Sample', ['phase', 'seconds', 'bytes', 'rows', 'ok'],
+                    defaults=[True])
+
+
+def emit(hooks, phase, seconds, bytes=0, rows=0, ok=True):
+    """
+    Calls every hook with the Sample of a phase.
+
+    Args:
+        hooks (iterable): Callables receiving the Sample.
+
+        phase (str): Name of the phase.
+
+        seconds (float): Wall time of the phase.
+
+        bytes (int): Bytes transferred during the phase.
+
+        rows (int): Rows produced by the phase.
+
+        ok (bool): False when the phase failed.
+    """
+    sample = Sample(phase, seconds, bytes, rows, ok)
+    for hook in hooks:
+        hook(sample)
+
+
+def row_count(columns):
+    """
+    Returns the number of rows of parsed columns.
+    """
+    return len(next(iter(columns.values()), []))
+
+
+class Timings():
+    """
+    Class for a hook adding up the samples of every phase.
+
+    Usage::
+
+        timings = Timings()
+        obj.hooks = [timings]
+        df = obj.get_data(start_date, end_date, 'F94170', '102')
+        print(timings.report())
+    """
+
+    def __init__(self):
+        self.phases = {}
+        self.lock = threading.Lock()
+
+    def __call__(self, sample):
+        with self.lock:
+            total = self.phases.setdefault(sample.phase, [0, 0.0, 0.0, 0, 0])
+            total[0] += 1
+            total[1] += sample.seconds
+            total[2] = max(total[2], sample.seconds)
+            total[3] += sample.bytes
+            total[4] += sample.rows
+
+    def summary(self):
+        """
+        Returns the totals of every phase.
+
+        Returns:
+            pandas.DataFrame: count, seconds, mean, max, bytes and rows
+            indexed by phase, in the order the phases were first seen.
+        """
+        with self.lock:
+            df = pd.DataFrame.from_dict(
+                self.phases, orient='index',
+                columns=['count', 'seconds', 'max', 'bytes', 'rows'])
+        df.index.name = 'phase'
+        df.insert(2, 'mean', df['seconds'] / df['count'])
+        return df
+
+    def report(self):
+        """
+        Returns the summary as a printable table.
+        """
+        return self.summary().to_string(float_format='{:.4f}'.format)
+
+    def clear(self):
+        """
+        Forgets every sample.
+        """
+        with self.lock:
+            self.phases.clear()
@@ -0,0 +1,77 @@
+import sys
+import os
+import threading
+sys.path.insert(0, os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), 'src'))
+from ghrs.fake import form_page, xml_rows  # noqa: F401
+from ghrs.query import Query
+
+
+class FakeResponse():
+
+    def __init__(self, status_code=200, content=b''):
+        self.status_code = status_code
+        self.content = content
+        self.text = content.decode('utf-8')
+
+    def iter_content(self, chunk_size=1):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+    def close(self):
+        pass
+
+
+class FakeSession():
+    """
+    Answers the PeopleSoft query form flow without a network.
+
+    The #ICOK post returns a second form echoing the bind dates, the
+    #ICQryDownloadXML post returns one row per day of the range.
+    """
+
+    def __init__(self, employees=2):
+        self.employees = employees
+        self.posts = []
+        self.lock = threading.Lock()
+        self.expired = False
+
+    def post(self, url, data=None, headers=None, **kwargs):
+        with self.lock:
+            self.posts.append(dict(data))
+        if self.expired:
+            return FakeResponse(status_code=302)
+        if data['ICAction'] == '#ICOK':
+            return FakeResponse(content=form_page(
+                'download', {
+                    'ICStateNum': '2',
+                    'InputKeys_bind1': data['InputKeys_bind1'],
+                    'InputKeys_bind2': data['InputKeys_bind2'],
+                    'InputKeys_ACCT_CD': data['InputKeys_ACCT_CD']}))
+        if data['ICAction'] == '#ICQryDownloadXML':
+            return FakeResponse(content=xml_rows(
+                data['InputKeys_bind1'], data['InputKeys_bind2'],
+                data['InputKeys_ACCT_CD'], self.employees))
+        return FakeResponse(status_code=500)
+
+
+class FakeQuery(Query):
+
+    header = {}
+
+    backoff = 0
+
+    def __init__(self, employees=2):
+        self.employees = employees
+        self.authentications = 0
+        self.reauthenticate()
+
+    def check_session(self):
+        return not self.session.expired
+
+    def reauthenticate(self):
+        self.authentications += 1
+        self.session = FakeSession(self.employees)
+        self.response = FakeResponse(content=form_page(
+            'query', {'ICStateNum': '1', 'ICAction': ''}))
+        return self.response
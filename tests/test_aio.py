@@ -0,0 +1,77 @@
+import unittest
+from datetime import date
+from .fakes import FakeQuery, form_page, xml_rows
+try:
+    from aiohttp import web
+    from aiohttp.test_utils import TestServer
+    from ghrs.aio import AsyncGHRS
+except ImportError:
+    web = None
+
+
+def fake_app():
+
+    async def query(request):
+        if request.query.get('token') != 'ok':
+            raise web.HTTPFound('/login')
+        return web.Response(body=form_page(
+            '/query?token=ok', {'ICStateNum': '1', 'ICAction': ''}))
+
+    async def login(request):
+        if request.headers.get('Authorization') is None:
+            raise web.HTTPUnauthorized()
+        raise web.HTTPFound('/query?token=ok')
+
+    async def post(request):
+        data = await request.post()
+        if data['ICAction'] == '#ICOK':
+            return web.Response(body=form_page('/query?token=ok', {
+                'InputKeys_bind1': data['InputKeys_bind1'],
+                'InputKeys_bind2': data['InputKeys_bind2'],
+                'InputKeys_ACCT_CD': data['InputKeys_ACCT_CD']}))
+        if data['InputKeys_ACCT_CD'] == 'BROKEN':
+            return web.Response(body=b'<query><row><EMPLID>1</query>')
+        return web.Response(body=xml_rows(
+            data['InputKeys_bind1'], data['InputKeys_bind2'],
+            data['InputKeys_ACCT_CD'], 2))
+
+    app = web.Application()
+    app.router.add_get('/query', query)
+    app.router.add_post('/query', post)
+    app.router.add_get('/login', login)
+    return app
+
+
+@unittest.skipIf(web is None, 'aiohttp is not installed')
+class TestAsyncGHRS(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+
+        self.server = TestServer(fake_app())
+        await self.server.start_server()
+        self.obj = AsyncGHRS(user='user', password='pass')
+        self.obj.api_url = str(self.server.make_url('/query'))
+        self.obj.auth_url = str(self.server.make_url('/login'))
+
+    async def asyncTearDown(self):
+
+        await self.obj.close()
+        await self.server.close()
+
+    async def test_authenticate(self):
+        response = await self.obj.authenticate()
+        self.assertEqual(response.status_code, 200)
+
+    async def test_get_data_matches_sync_path(self):
+        await self.obj.authenticate()
+        args = (date(2021, 1, 1), date(2021, 2, 10), 'F94170', '102')
+        df = await self.obj.get_data(*args, chunk='week')
+        self.assertTrue(df.equals(FakeQuery().get_data(*args)))
+
+    async def test_failures_return_none(self):
+        await self.obj.authenticate()
+        args = (date(2021, 1, 1), date(2021, 2, 10))
+        self.assertIsNone(await self.obj.get_data(*args, 'BROKEN', '102',
+                                                  chunk='week'))
+        await self.server.close()
+        self.assertIsNone(await self.obj.get_data(*args, 'F94170', '102'))
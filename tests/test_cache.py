@@ -0,0 +1,145 @@
+import unittest
+import tempfile
+from datetime import date
+from dateutil.relativedelta import relativedelta
+from .fakes import FakeQuery
+from ghrs.cache import MemoryCache, RangeCache, ResultCache
+
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+
+        self.directory = tempfile.TemporaryDirectory()
+        self.obj = FakeQuery()
+        self.obj.cache = ResultCache(self.directory.name)
+        self.fresh = FakeQuery()
+
+    def tearDown(self):
+
+        self.directory.cleanup()
+
+    def posts(self):
+        return [(p['InputKeys_bind1'], p['InputKeys_bind2'])
+                for p in self.obj.session.posts
+                if p['ICAction'] == '#ICOK']
+
+    def test_cached_weeks_are_not_fetched_again(self):
+        args = (date(2021, 1, 6), date(2021, 1, 20), 'F94170', '102')
+        df = self.obj.get_data(*args)
+        self.assertTrue(df.equals(self.fresh.get_data(*args)))
+        self.assertEqual(self.posts(), [('2021/01/04', '2021/01/24')])
+        self.assertTrue(self.obj.get_data(*args).equals(df))
+        self.assertEqual(len(self.posts()), 1)
+
+    def test_only_missing_weeks_are_fetched(self):
+        self.obj.get_data(date(2021, 1, 11), date(2021, 1, 17),
+                          'F94170', '102')
+        args = (date(2021, 1, 1), date(2021, 1, 31), 'F94170', '102')
+        df = self.obj.get_data(*args)
+        self.assertEqual(self.posts(), [('2021/01/11', '2021/01/17'),
+                                        ('2020/12/28', '2021/01/10'),
+                                        ('2021/01/18', '2021/01/31')])
+        self.assertTrue(df.equals(self.fresh.get_data(*args)))
+
+    def test_unreadable_weeks_are_fetched_again(self):
+        args = (date(2021, 1, 4), date(2021, 1, 24), 'F94170', '102')
+        df = self.obj.get_data(*args)
+        path = self.obj.cache.path(('F94170', '102', False),
+                                   date(2021, 1, 11))
+        with open(path, 'w') as f:
+            f.write('{"schema": {}, "colu')
+        self.assertTrue(self.obj.get_data(*args).equals(df))
+        self.assertEqual(self.posts()[1:], [('2021/01/11', '2021/01/17')])
+        self.assertTrue(self.obj.get_data(*args).equals(df))
+        self.assertEqual(len(self.posts()), 2)
+
+    def test_recent_weeks_are_refreshed_after_ttl(self):
+        self.obj.cache.ttl = 0
+        today = date.today()
+        args = (today - relativedelta(weeks=6), today, 'F94170', '102')
+        self.obj.get_data(*args)
+        self.obj.get_data(*args)
+        first, second = self.posts()
+        self.assertLess(first[0], second[0])
+        self.assertEqual(first[1], second[1])
+
+
+class TestRangeCache(unittest.TestCase):
+
+    def setUp(self):
+
+        self.obj = FakeQuery()
+        self.obj.cache = RangeCache()
+        self.fresh = FakeQuery()
+
+    def posts(self):
+        return [(p['InputKeys_bind1'], p['InputKeys_bind2'])
+                for p in self.obj.session.posts
+                if p['ICAction'] == '#ICOK']
+
+    def test_only_uncovered_sub_ranges_are_fetched(self):
+        self.obj.get_data(date(2021, 1, 10), date(2021, 1, 20),
+                          'F94170', '102')
+        self.obj.get_data(date(2021, 2, 1), date(2021, 2, 5),
+                          'F94170', '102')
+        args = (date(2021, 1, 1), date(2021, 2, 10), 'F94170', '102')
+        df = self.obj.get_data(*args)
+        self.assertEqual(self.posts()[2:], [('2021/01/01', '2021/01/09'),
+                                            ('2021/01/21', '2021/01/31'),
+                                            ('2021/02/06', '2021/02/10')])
+        self.assertTrue(df.equals(self.fresh.get_data(*args)))
+        self.assertTrue(self.obj.get_data(*args).equals(df))
+        self.assertEqual(len(self.posts()), 5)
+
+    def test_pairs_are_cached_separately(self):
+        args = (date(2021, 1, 1), date(2021, 1, 10))
+        self.obj.get_data(*args, 'F94170', '102')
+        df = self.obj.get_data(*args, 'F94171', '102')
+        self.assertEqual(list(df['ACCT_CD'].unique()), ['F94171'])
+        self.assertEqual(len(self.posts()), 2)
+
+    def test_overlapping_stores_keep_the_covered_days(self):
+        cache = RangeCache()
+        key = ('F94170', '102', False)
+        first = (date(2021, 1, 1), date(2021, 1, 10))
+        second = (date(2021, 1, 5), date(2021, 1, 15))
+        self.assertEqual(cache.gaps(key, *first), [first])
+        self.assertEqual(cache.gaps(key, *second), [second])
+        cache.store(key, *first,
+                    self.fresh.get_data(*first, 'F94170', '102'))
+        cache.store(key, *second,
+                    self.fresh.get_data(*second, 'F94170', '102'))
+        for start, end in [first, second, (first[0], second[1])]:
+            self.assertTrue(cache.read(key, start, end).equals(
+                self.fresh.get_data(start, end, 'F94170', '102')))
+
+
+class TestMemoryCache(unittest.TestCase):
+
+    def setUp(self):
+
+        self.obj = FakeQuery()
+        self.obj.memo = MemoryCache()
+        self.args = (date(2021, 1, 1), date(2021, 1, 31), 'F94170', '102')
+
+    def test_hits_return_copies(self):
+        df = self.obj.get_data(*self.args)
+        df['TL_QUANTITY'] = 0.0
+        again = self.obj.get_data(*self.args)
+        self.assertEqual(again['TL_QUANTITY'].sum(), 8.0 * len(again))
+        self.assertEqual(len(self.obj.session.posts), 2)
+        self.assertEqual((self.obj.memo.hits, self.obj.memo.misses), (1, 1))
+
+    def test_eviction_by_memory(self):
+        df = self.obj.get_data(*self.args)
+        size = int(df.memory_usage(deep=True).sum())
+        self.obj.memo.max_bytes = size * 2
+        self.obj.get_data(date(2021, 2, 1), date(2021, 3, 3),
+                          'F94170', '102')
+        self.obj.get_data(*self.args)
+        self.obj.get_data(date(2021, 4, 1), date(2021, 5, 1),
+                          'F94170', '102')
+        self.assertEqual(self.obj.memo.evictions, 1)
+        self.assertLessEqual(self.obj.memo.bytes, size * 2)
+        self.assertIn(self.args + (False,), self.obj.memo.entries)
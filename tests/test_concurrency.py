@@ -0,0 +1,136 @@
+import os
+import time
+import tempfile
+import unittest
+import threading
+from datetime import date
+from concurrent.futures import ThreadPoolExecutor
+from .fakes import FakeQuery
+from ghrs.concurrency import (FileSemaphore, Governor, SingleFlight,
+                              TokenBucket)
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def setUp(self):
+
+        self.obj = FakeQuery()
+        self.obj.flight = SingleFlight()
+        self.release = threading.Event()
+        download = self.obj._download
+
+        def blocking(*args):
+            self.release.wait(5)
+            return download(*args)
+
+        self.obj._download = blocking
+
+    def wait_for(self, condition):
+        deadline = time.monotonic() + 5
+        while not condition() and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_concurrent_identical_queries_share_one_fetch(self):
+        args = (date(2021, 1, 1), date(2021, 1, 31), 'F94170', '102')
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            futures = [executor.submit(self.obj.get_data, *args)
+                       for i in range(5)]
+            self.wait_for(lambda: self.obj.flight.suppressed == 4)
+            self.release.set()
+            frames = [f.result() for f in futures]
+        self.assertEqual(len(self.obj.session.posts), 2)
+        self.assertEqual(self.obj.flight.suppressed, 4)
+        self.assertEqual(len({id(df) for df in frames}), 5)
+        self.assertTrue(all(df.equals(frames[0]) for df in frames))
+
+    def test_errors_reach_every_waiter(self):
+        self.obj._download = lambda *args: (self.release.wait(5),
+                                            1 / 0)[1]
+        args = (date(2021, 1, 1), date(2021, 1, 31), 'F94170', '102')
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [executor.submit(self.obj.get_data, *args)
+                       for i in range(3)]
+            self.wait_for(lambda: self.obj.flight.suppressed == 2)
+            self.release.set()
+            for future in futures:
+                self.assertRaises(ZeroDivisionError, future.result)
+        self.assertEqual(self.obj.flight.calls, {})
+
+    def test_waiters_copy_a_snapshot_taken_before_the_leader_returns(self):
+        flight = SingleFlight()
+        returned = threading.Event()
+        copies = []
+
+        class Result(dict):
+
+            def copy(self):
+                copies.append(returned.is_set())
+                return Result(self)
+
+        def leader():
+            result = flight.do('key', lambda: (self.release.wait(5),
+                                               Result(rows=1))[1])
+            returned.set()
+            result['rows'] = 2
+            return result
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            first = executor.submit(leader)
+            self.wait_for(lambda: flight.calls)
+            second = executor.submit(flight.do, 'key', None)
+            self.wait_for(lambda: flight.suppressed == 1)
+            self.release.set()
+            self.assertEqual(first.result(), {'rows': 2})
+            self.assertEqual(second.result(), {'rows': 1})
+        self.assertFalse(copies[0])
+
+
+class TestGovernor(unittest.TestCase):
+
+    def test_token_bucket_limits_the_rate(self):
+
+        bucket = TokenBucket(rate=50, burst=2)
+        start = time.monotonic()
+        for i in range(7):
+            bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+    def test_max_in_flight_per_endpoint(self):
+
+        governor = Governor()
+        governor.configure('https://hcms', max_in_flight=2)
+        lock = threading.Lock()
+        running = [0, 0]
+
+        def call(url):
+            with governor.slot(url):
+                with lock:
+                    running[0] += 1
+                    running[1] = max(running)
+                time.sleep(0.02)
+                with lock:
+                    running[0] -= 1
+
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            list(executor.map(call, ['https://hcms/q/?a'] * 6))
+        self.assertEqual(running[1], 2)
+        self.assertIsNone(governor.limit('https://wam.saipem.com'))
+
+    def test_longest_endpoint_prefix_applies(self):
+
+        governor = Governor()
+        governor.configure('https://hcms', rate=1)
+        governor.configure('https://hcms/psc', rate=2)
+        self.assertEqual(governor.limit('https://hcms/psc/q').bucket.rate, 2)
+        self.assertEqual(governor.limit('https://hcms/psp').bucket.rate, 1)
+
+    def test_file_semaphore_is_shared_by_lock_files(self):
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'hcms')
+            first = FileSemaphore(path, 1)
+            second = FileSemaphore(path, 1)
+            f = first.acquire()
+            self.assertIsNone(second.acquire(timeout=0.1))
+            first.release(f)
+            second.release(second.acquire(timeout=1))
@@ -0,0 +1,88 @@
+import asyncio
+import unittest
+import threading
+from datetime import date
+from . import fakes  # noqa: F401, puts src on sys.path
+from ghrs.concurrency import Governor
+from ghrs.fake import FakePeopleSoft
+from ghrs.timing import Timings
+try:
+    from ghrs.aio import AsyncGHRS
+except ImportError:
+    AsyncGHRS = None
+
+
+class TestFakePeopleSoft(unittest.TestCase):
+
+    def setUp(self):
+
+        self.server = FakePeopleSoft(employees=3).start()
+        self.obj = self.server.client()
+        self.obj.backoff = 0
+
+    def tearDown(self):
+
+        self.obj.session.close()
+        self.server.close()
+
+    def test_authentication_chain(self):
+        self.assertEqual(self.obj.response.status_code, 200)
+        self.assertEqual(self.server.requests, {'page': 2, 'auth': 1})
+        self.assertTrue(self.obj.check_session())
+
+    def test_wrong_password_is_rejected(self):
+        obj = self.server.client(password='wrong')
+        self.assertEqual(obj.response.status_code, 401)
+        obj.session.close()
+
+    def test_get_data_over_http(self):
+        timings = Timings()
+        self.obj.hooks = [timings]
+        df = self.obj.get_data(date(2021, 1, 1), date(2021, 3, 31),
+                               'F94170', '102', chunk='month')
+        self.assertEqual(len(df), 3 * 90)
+        self.assertEqual(df['DUR'].max(), date(2021, 3, 31))
+        self.assertEqual(self.server.requests['#ICQryDownloadXML'], 3)
+        self.assertGreater(timings.summary().loc['download', 'bytes'], 0)
+
+    def test_expired_session_is_authenticated_again(self):
+        self.server.expire()
+        self.assertFalse(self.obj.check_session())
+        df = self.obj.get_data(date(2021, 1, 4), date(2021, 1, 10),
+                               'F94170', '102')
+        self.assertEqual(len(df), 3 * 7)
+        self.assertEqual(self.obj.authentications, 2)
+
+    def test_redirects_hold_one_governed_slot(self):
+        governor = Governor()
+        governor.configure(self.server.url, max_in_flight=1)
+        self.obj.session.governor = governor
+        self.server.expire()
+        result = []
+        thread = threading.Thread(target=lambda: result.append(
+            self.obj.get_data(date(2021, 1, 4), date(2021, 1, 10),
+                              'F94170', '102')), daemon=True)
+        thread.start()
+        thread.join(10)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(len(result[0]), 3 * 7)
+        response = self.obj.session.get(self.server.api_url)
+        self.assertEqual(len(response.history), 0)
+        self.obj.session.cookies.clear()
+        response = self.obj.session.get(self.server.api_url,
+                                        auth=(self.server.user,
+                                              self.server.password))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r.status_code for r in response.history],
+                         [302, 302])
+
+    @unittest.skipIf(AsyncGHRS is None, 'aiohttp is not installed')
+    def test_async_client(self):
+
+        async def get_data():
+            async with self.server.client(AsyncGHRS) as obj:
+                return await obj.get_data(date(2021, 1, 1),
+                                          date(2021, 2, 28), 'F94170',
+                                          '102', chunk='month')
+
+        self.assertEqual(len(asyncio.run(get_data())), 3 * 59)
@@ -0,0 +1,64 @@
+import unittest
+from datetime import date
+from urllib.request import urlopen
+from .fakes import FakeQuery
+from ghrs.cache import MemoryCache, RangeCache
+from ghrs.metrics import Metrics
+
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+
+        self.obj = FakeQuery()
+        self.obj.memo = MemoryCache()
+        self.metrics = Metrics()
+        self.metrics.watch('memo', self.obj.memo)
+        self.obj.hooks = [self.metrics]
+        self.args = (date(2021, 1, 4), date(2021, 1, 10), 'F94170', '102')
+
+    def tearDown(self):
+
+        self.metrics.close()
+
+    def test_outcomes_histograms_and_cache_ratio(self):
+        self.obj.get_data(*self.args)
+        self.obj.get_data(*self.args)
+        self.obj.session.expired = True
+        self.obj.reauthenticate = lambda: None
+        self.obj.get_data(date(2021, 2, 1), date(2021, 2, 7), 'F94170',
+                          '102')
+        text = self.metrics.exposition()
+        self.assertIn('ghrs_requests_total{phase="get_data",outcome="ok"} 2',
+                      text)
+        self.assertIn(
+            'ghrs_requests_total{phase="get_data",outcome="failed"} 1', text)
+        self.assertIn(
+            f'ghrs_requests_total{{phase="query",outcome="failed"}} '
+            f'{1 + self.obj.retries}', text)
+        self.assertIn('ghrs_phase_seconds_bucket{phase="get_data",le="+Inf"} '
+                      '3', text)
+        self.assertIn('ghrs_rows_total{phase="parse_xml"} 14', text)
+        self.assertIn('ghrs_cache_hits_total{cache="memo"} 1', text)
+        self.assertIn('ghrs_cache_misses_total{cache="memo"} 2', text)
+        self.assertIn('ghrs_cache_hit_ratio{cache="memo"} 0.333', text)
+
+    def test_range_cache_and_caches_without_counters(self):
+        self.obj.cache = RangeCache()
+        self.metrics.watch('range', self.obj.cache)
+        self.metrics.watch('other', object())
+        self.obj.memo = None
+        self.obj.get_data(*self.args)
+        self.obj.get_data(*self.args)
+        text = self.metrics.exposition()
+        self.assertIn('ghrs_cache_hit_ratio{cache="range"} 0.5', text)
+        self.assertNotIn('cache="other"', text)
+
+    def test_metrics_are_served_over_http(self):
+        self.obj.get_data(*self.args)
+        server = self.metrics.serve(port=0)
+        url = f'http://127.0.0.1:{server.server_address[1]}/metrics'
+        with urlopen(url, timeout=5) as response:
+            text = response.read().decode('utf-8')
+        self.assertIn('# TYPE ghrs_phase_seconds histogram', text)
+        self.assertIn('ghrs_bytes_total{phase="download"}', text)
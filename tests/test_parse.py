@@ -0,0 +1,85 @@
+import unittest
+import xml.etree.ElementTree as ET
+from io import StringIO
+from datetime import date
+import pandas as pd
+from .fakes import xml_rows
+from ghrs.parse import (SCHEMA, RowParser, parse_xml, read_form, soup_form,
+                        to_dataframe)
+
+
+class TestStreaming(unittest.TestCase):
+
+    def setUp(self):
+
+        self.content = xml_rows('2021/01/01', '2021/01/31', 'F94170', 3)
+
+    def test_parse_xml_matches_element_tree(self):
+        expected = pd.DataFrame([
+            {i.tag: i.text for i in r.iter() if i.tag != 'row'}
+            for r in ET.parse(StringIO(
+                self.content.decode('utf-8'))).iter('row')])
+        chunks = [self.content[i:i + 7]
+                  for i in range(0, len(self.content), 7)]
+        self.assertTrue(pd.DataFrame(parse_xml(chunks)).equals(expected))
+
+    def test_rows_are_parsed_as_they_arrive(self):
+        parser = RowParser()
+        rows = parser.feed(self.content[:len(self.content) // 2])
+        self.assertGreater(rows, 0)
+        parser.feed(self.content[len(self.content) // 2:])
+        self.assertEqual(len(parser.close()['EMPLID']), 31 * 3)
+
+    def test_intern_shares_equal_values(self):
+        columns = parse_xml([self.content], intern=True)
+        self.assertIs(columns['FIRST_NAME'][0], columns['FIRST_NAME'][3])
+
+    def test_missing_fields_are_padded(self):
+        columns = parse_xml([
+            b'<query><row><A>1</A></row><row><B>2</B></row>'
+            b'<row><A>3</A><B>4</B></row></query>'])
+        self.assertEqual(columns, {'A': ['1', None, '3'],
+                                   'B': [None, '2', '4']})
+
+
+class TestSchema(unittest.TestCase):
+
+    def setUp(self):
+
+        self.columns = parse_xml([xml_rows('2021/01/01', '2021/01/10',
+                                           'F94170', 2)])
+
+    def test_declared_columns_are_converted(self):
+        df = to_dataframe(self.columns)
+        self.assertEqual(df['DUR'][0], date(2021, 1, 1))
+        self.assertEqual(df['TL_QUANTITY'].dtype, float)
+        self.assertEqual(list(df['USER_FIELD_3'].unique()), [''])
+        self.assertIsInstance(df['EMPLID'][0], str)
+
+    def test_schema_can_be_extended(self):
+        df = to_dataframe(self.columns, {**SCHEMA, 'EMPL_RCD': 'float'})
+        self.assertEqual(df['EMPL_RCD'].dtype, float)
+
+
+PAGE = b'''<html><head><script>var f = "<form action='no'>";</script></head>
+<body><input name="outside" value="x"/>
+<form name="win0" method="post" action="/psc/EMPLOYEE/?a=1&amp;b=2">
+<div><input type="hidden" name="ICStateNum" value="3">
+<input type="hidden" name="ICAction" value="None">
+<input type="text" name="InputKeys_bind1" value="">
+<input type="checkbox" name="flag" checked>
+<input type="button" value="OK">
+<input type="hidden" name="ICSID" value="a&amp;b&quot;c"></div>
+</form>
+<form action="second"><input name="other" value="y"></form>
+</body></html>'''
+
+
+class TestReadForm(unittest.TestCase):
+
+    def test_matches_beautifulsoup(self):
+        self.assertEqual(read_form(PAGE), soup_form(PAGE))
+        self.assertEqual(read_form(PAGE)[0], '/psc/EMPLOYEE/?a=1&b=2')
+
+    def test_page_without_form(self):
+        self.assertIsNone(read_form(b'<html><body>Signed out</body></html>'))
@@ -0,0 +1,106 @@
+import unittest
+import threading
+from datetime import date, datetime
+import requests
+from .fakes import FakeQuery, FakeResponse
+from ghrs.ghrs import GHRS
+from ghrs.pool import SessionPool
+
+
+class TestSessionPool(unittest.TestCase):
+
+    def setUp(self):
+
+        self.created = []
+
+        def factory():
+            member = FakeQuery()
+            self.created.append(member)
+            return member
+
+        self.pool = SessionPool(size=3, max_idle=0, factory=factory)
+
+    def test_sessions_authenticated_up_front(self):
+        self.assertEqual(len(self.created), 3)
+        self.assertEqual(self.pool.idle.qsize(), 3)
+
+    def test_chunks_are_spread_over_sessions(self):
+        barrier = threading.Barrier(3, timeout=5)
+        for member in self.created:
+            download = member._download
+            member._download = lambda *args, download=download: (
+                barrier.wait(), download(*args))[1]
+        df = self.pool.get_data(date(2021, 1, 4), date(2021, 3, 28),
+                                'F94170', '102', chunk='week',
+                                max_workers=3)
+        self.assertEqual(len(df), 2 * 7 * 12)
+        self.assertEqual(sum(len(m.session.posts) for m in self.created),
+                         2 * 12)
+        self.assertEqual(
+            sum(1 for m in self.created if m.session.posts), 3)
+
+    def test_expired_session_is_replaced(self):
+        with self.pool.session() as member:
+            member.response = FakeResponse(status_code=302)
+        df = self.pool.get_data(date(2021, 1, 4), date(2021, 1, 10),
+                                'F94170', '102')
+        self.assertEqual(len(df), 2 * 7)
+        self.assertEqual(self.pool.replaced, 1)
+        self.assertEqual(len(self.created), 4)
+
+    def test_failed_replacement_keeps_the_pool_size(self):
+
+        def factory():
+            raise requests.ConnectionError('authentication is down')
+
+        pool = SessionPool(size=1, max_idle=0, factory=FakeQuery)
+        pool.factory = factory
+        with pool.session() as member:
+            member.response = FakeResponse(status_code=302)
+        for i in range(2):
+            with self.assertRaises(requests.ConnectionError):
+                pool.acquire()
+            self.assertEqual(pool.idle.qsize(), 1)
+        pool.max_idle = 300
+        with pool.session() as member:
+            member._download = lambda *args, **kwargs: None
+        with self.assertRaises(requests.ConnectionError):
+            pool.get_data(date(2021, 1, 4), date(2021, 1, 10), 'F94170',
+                          '102')
+        self.assertEqual(pool.idle.qsize(), 1)
+
+    def test_adaptive_chunks_are_bisected_on_borrowed_sessions(self):
+        self.pool.max_idle = 300
+        for member in self.created:
+            post = member.session.post
+
+            def limited(url, data=None, post=post, **kwargs):
+                if data['ICAction'] == '#ICOK' and (
+                        datetime.strptime(data['InputKeys_bind2'],
+                                          '%Y/%m/%d')
+                        - datetime.strptime(data['InputKeys_bind1'],
+                                            '%Y/%m/%d')).days >= 10:
+                    return FakeResponse(status_code=500)
+                return post(url, data, **kwargs)
+
+            member.session.post = limited
+        args = (date(2021, 1, 1), date(2021, 1, 31), 'F94170', '102')
+        df = self.pool.get_data(*args, chunk='adaptive', max_workers=3)
+        self.assertTrue(df.equals(FakeQuery().get_data(*args)))
+        self.assertLessEqual(self.pool.chunk_days[('F94170', '102')], 15)
+
+
+class TestConnectionPool(unittest.TestCase):
+
+    def test_new_session_mounts_the_tuned_adapter(self):
+
+        obj = GHRS.__new__(GHRS)
+        obj.pool_maxsize = 32
+        obj.pool_block = True
+        obj.max_retries = 5
+        session = obj.new_session()
+        adapter = session.get_adapter(GHRS.api_url)
+        self.assertEqual(adapter._pool_maxsize, 32)
+        self.assertTrue(adapter._pool_block)
+        self.assertEqual(adapter.max_retries.total, 5)
+        self.assertIs(session.governor, GHRS.governor)
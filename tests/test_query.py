@@ -0,0 +1,228 @@
+import unittest
+import threading
+from datetime import date, datetime
+import pandas as pd
+from .fakes import FakeQuery, FakeResponse
+from ghrs.query import (OverBudget, backoff_delay, counted,
+                        split_date_range)
+
+
+class TestSharding(unittest.TestCase):
+
+    def setUp(self):
+
+        self.obj = FakeQuery()
+
+    def test_split_date_range_weeks(self):
+        ranges = split_date_range(date(2021, 1, 1), date(2021, 1, 20),
+                                  'week')
+        self.assertEqual(ranges, [
+            (date(2021, 1, 1), date(2021, 1, 3)),
+            (date(2021, 1, 4), date(2021, 1, 10)),
+            (date(2021, 1, 11), date(2021, 1, 17)),
+            (date(2021, 1, 18), date(2021, 1, 20))])
+
+    def test_split_date_range_months(self):
+        ranges = split_date_range(date(2020, 1, 15), date(2020, 3, 1),
+                                  'month')
+        self.assertEqual(ranges, [
+            (date(2020, 1, 15), date(2020, 1, 31)),
+            (date(2020, 2, 1), date(2020, 2, 29)),
+            (date(2020, 3, 1), date(2020, 3, 1))])
+
+    def test_split_date_range_unknown_chunk(self):
+        with self.assertRaises(ValueError):
+            split_date_range(date(2020, 1, 1), date(2020, 1, 2), 'day')
+
+    def test_get_data_chunked_matches_single_request(self):
+        args = (date(2021, 1, 1), date(2021, 3, 10), 'F94170', '102')
+        df = self.obj.get_data(*args)
+        chunked = self.obj.get_data(*args, chunk='week', max_workers=3)
+        self.assertEqual(len(self.obj.session.posts), 2 + 2 * 11)
+        self.assertTrue(chunked.equals(df))
+
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+
+        self.obj = FakeQuery()
+
+    def test_get_data_many_reports_failures_per_pair(self):
+        fetch = self.obj._fetch_data
+
+        def flaky(start_date, end_date, cost_center, company_code):
+            if cost_center == 'BAD':
+                raise ConnectionError('reset')
+            if cost_center == 'NONE':
+                return None
+            return fetch(start_date, end_date, cost_center, company_code)
+
+        self.obj._fetch_data = flaky
+        pairs = [('F94170', '102'), ('BAD', '102'), ('NONE', '103'),
+                 ('F94171', '103')]
+        df, failures = self.obj.get_data_many(
+            pairs, date(2021, 1, 4), date(2021, 1, 10), max_workers=2)
+        self.assertEqual(sorted(failures), [('BAD', '102'),
+                                            ('NONE', '103')])
+        self.assertIn('ConnectionError', failures[('BAD', '102')])
+        self.assertEqual(len(df), 2 * 2 * 7)
+        self.assertEqual(list(df['ACCT_CD'].unique()), ['F94170', 'F94171'])
+        self.assertEqual(list(df['COMPANY'].unique()), ['102', '103'])
+
+        data, _ = self.obj.get_data_many(
+            pairs, date(2021, 1, 4), date(2021, 1, 10), combine=False)
+        self.assertEqual(sorted(data), [('F94170', '102'),
+                                        ('F94171', '103')])
+
+
+class TestCompact(unittest.TestCase):
+
+    def setUp(self):
+
+        self.obj = FakeQuery()
+        self.args = (date(2021, 1, 1), date(2021, 2, 28), 'F94170', '102')
+
+    def test_compact_columns_are_categorical(self):
+        self.obj.compact = True
+        df = self.obj.get_data(*self.args, chunk='month')
+        for name in ['EMPLID', 'FIRST_NAME', 'ACCT_CD', 'USER_FIELD_3']:
+            self.assertIsInstance(df[name].dtype, pd.CategoricalDtype)
+        self.assertEqual(df['TL_QUANTITY'].dtype, float)
+
+    def test_compact_summary_matches(self):
+        df = self.obj.summarize_by_week(self.obj.get_data(*self.args))
+        self.obj.compact = True
+        compact = self.obj.summarize_by_week(self.obj.get_data(*self.args))
+        self.assertTrue(compact.astype(str).equals(df.astype(str)))
+
+
+class TestIterData(unittest.TestCase):
+
+    def setUp(self):
+
+        self.obj = FakeQuery()
+
+    def test_chunks_are_yielded_in_order_as_downloaded(self):
+        chunks = self.obj.iter_data(date(2021, 1, 15), date(2021, 3, 10),
+                                    'F94170', '102', chunk='month',
+                                    prefetch=0)
+        first = next(chunks)
+        self.assertEqual(len(self.obj.session.posts), 2)
+        self.assertEqual(first['DUR'].max(), date(2021, 1, 31))
+        rest = list(chunks)
+        self.assertEqual([len(df) for df in [first] + rest],
+                         [2 * 17, 2 * 28, 2 * 10])
+
+    def test_next_chunk_downloads_while_current_is_processed(self):
+        started = threading.Event()
+        download = self.obj._download
+
+        def recording(start_date, *args, **kwargs):
+            if start_date == date(2021, 2, 1):
+                started.set()
+            return download(start_date, *args, **kwargs)
+
+        self.obj._download = recording
+        chunks = self.obj.iter_data(date(2021, 1, 15), date(2021, 3, 10),
+                                    'F94170', '102', chunk='month')
+        next(chunks)
+        self.assertTrue(started.wait(5))
+        self.assertEqual([len(df) for df in chunks], [2 * 28, 2 * 10])
+
+
+class TestRetry(unittest.TestCase):
+
+    def setUp(self):
+
+        self.obj = FakeQuery()
+        self.args = (date(2021, 1, 4), date(2021, 1, 10), 'F94170', '102')
+
+    def test_expired_session_is_authenticated_again(self):
+        self.obj.get_data(*self.args)
+        self.obj.session.expired = True
+        df = self.obj.get_data(*self.args)
+        self.assertEqual(len(df), 2 * 7)
+        self.assertEqual(self.obj.authentications, 2)
+
+    def test_retries_are_bounded(self):
+        self.obj.reauthenticate = lambda: None
+        self.obj.session.expired = True
+        self.assertIsNone(self.obj.get_data(*self.args))
+        self.assertEqual(len(self.obj.session.posts), 1 + self.obj.retries)
+
+    def test_backoff_delay_is_bounded(self):
+        for attempt in range(1, 10):
+            delay = backoff_delay(attempt, 0.5, 4)
+            self.assertGreaterEqual(delay, 0)
+            self.assertLessEqual(delay, min(4, 0.5 * 2 ** (attempt - 1)))
+
+
+class TestAdaptive(unittest.TestCase):
+
+    def setUp(self):
+
+        self.obj = FakeQuery()
+        self.failures = 0
+        post = self.obj.session.post
+
+        def limited(url, data=None, **kwargs):
+            if data['ICAction'] == '#ICOK':
+                start, end = (datetime.strptime(data[k], '%Y/%m/%d')
+                              for k in ['InputKeys_bind1', 'InputKeys_bind2'])
+                if (end - start).days >= 10:
+                    self.failures += 1
+                    return FakeResponse(status_code=500)
+            return post(url, data, **kwargs)
+
+        self.obj.session.post = limited
+        self.args = (date(2021, 1, 1), date(2021, 3, 1), 'F94170', '102')
+
+    def test_failed_ranges_are_bisected_and_chunk_size_learned(self):
+        df = self.obj.get_data(*self.args, chunk='adaptive')
+        self.assertTrue(df.equals(FakeQuery().get_data(*self.args)))
+        for i in range(4):
+            self.obj.get_data(*self.args, chunk='adaptive')
+        self.assertLessEqual(self.obj.chunk_days[('F94170', '102')], 10)
+        failures = self.failures
+        self.obj.get_data(*self.args, chunk='adaptive')
+        self.assertEqual(self.failures, failures)
+
+    def test_expired_session_does_not_shrink_chunk_size(self):
+        obj = FakeQuery()
+        obj.session.expired = True
+        args = (date(2021, 1, 1), date(2021, 4, 30), 'F94170', '102')
+        df = obj.get_data(*args, chunk='adaptive', max_workers=1)
+        self.assertTrue(df.equals(FakeQuery().get_data(*args)))
+        self.assertEqual(obj.chunk_days[('F94170', '102')], 31)
+        self.assertEqual(obj.authentications, 2)
+
+    def test_chunk_size_grows_back_without_budgets(self):
+        obj = FakeQuery()
+        obj.chunk_days = {('F94170', '102'): 1}
+        sizes = []
+        for i in range(5):
+            obj.get_data(*self.args, chunk='adaptive')
+            sizes.append(obj.chunk_days[('F94170', '102')])
+        self.assertEqual(sizes, [2, 4, 8, 16, 31])
+
+    def test_oversized_responses_are_bisected(self):
+        self.obj.max_response_bytes = 2000
+        args = (date(2021, 1, 1), date(2021, 1, 8), 'F94170', '102')
+        df = self.obj.get_data(*args, chunk='adaptive')
+        self.assertTrue(df.equals(FakeQuery().get_data(*args)))
+        self.assertEqual(self.obj.chunk_days[('F94170', '102')], 2)
+        downloads = [(p['InputKeys_bind1'], p['InputKeys_bind2'])
+                     for p in self.obj.session.posts
+                     if p['ICAction'] == '#ICQryDownloadXML']
+        self.assertEqual(downloads[:3], [('2021/01/01', '2021/01/08'),
+                                         ('2021/01/01', '2021/01/04'),
+                                         ('2021/01/01', '2021/01/02')])
+
+    def test_download_stops_over_budget(self):
+        consumed = []
+        chunks = (consumed.append(i) or b'x' * 10 for i in range(5))
+        stats = {'max_bytes': 25}
+        with self.assertRaises(OverBudget):
+            list(counted(chunks, stats))
+        self.assertEqual(consumed, [0, 1, 2])
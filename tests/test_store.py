@@ -0,0 +1,46 @@
+import os
+import unittest
+import tempfile
+from datetime import date
+from dateutil.relativedelta import relativedelta
+from .fakes import FakeQuery
+from ghrs.query import week_window
+from ghrs.store import SQLiteStore
+
+
+class TestSync(unittest.TestCase):
+
+    def setUp(self):
+
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = SQLiteStore(os.path.join(self.directory.name,
+                                              'ghrs.db'))
+        self.obj = FakeQuery()
+
+    def tearDown(self):
+
+        self.directory.cleanup()
+
+    def test_sync_pulls_only_the_correction_window(self):
+        start_date = date.today() - relativedelta(weeks=10)
+        _, end_date = week_window(relativedelta(weeks=0))
+        self.obj.sync('F94170', '102', self.store, start_date=start_date)
+        self.assertEqual(self.store.watermark('F94170', '102'), end_date)
+        first = self.store.read('F94170', '102')
+        self.assertEqual(len(first),
+                         2 * ((end_date - start_date).days + 1))
+
+        self.obj.session.posts.clear()
+        rows = self.obj.sync('F94170', '102', self.store)
+        window_start = date.today() - relativedelta(weeks=4)
+        self.assertEqual(rows, 2 * ((end_date - window_start).days + 1))
+        binds = [p['InputKeys_bind1'] for p in self.obj.session.posts
+                 if p['ICAction'] == '#ICOK']
+        self.assertEqual(min(binds), window_start.strftime('%Y/%m/%d'))
+        second = self.store.read('F94170', '102')
+        self.assertTrue(second.equals(first))
+
+    def test_failed_pull_keeps_watermark(self):
+        self.obj._download = lambda *args: None
+        self.assertIsNone(self.obj.sync('F94170', '102', self.store))
+        self.assertIsNone(self.store.watermark('F94170', '102'))
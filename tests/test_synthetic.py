@@ -0,0 +1,68 @@
+import unittest
+from datetime import date
+from . import fakes  # noqa: F401, puts src on sys.path
+from ghrs.fake import FakePeopleSoft
+from ghrs.parse import SCHEMA, compact_schema, parse_xml, to_dataframe
+from ghrs.synthetic import BLOCK, Timesheets
+
+
+class TestTimesheets(unittest.TestCase):
+
+    def setUp(self):
+
+        self.data = Timesheets(date(2021, 1, 1), date(2021, 3, 31),
+                               employees=40, cost_centers=['F94170',
+                                                           'F94171'],
+                               jobs=7, null_rates={'USER_FIELD_3': 0.5,
+                                                   'TL_QUANTITY': 0.1})
+
+    def test_xml_and_dataframe_agree(self):
+        for compact in (False, True):
+            schema = compact_schema(SCHEMA) if compact else SCHEMA
+            parsed = to_dataframe(parse_xml(self.data.xml_chunks(rows=999),
+                                            intern=compact), schema)
+            self.assertTrue(parsed.equals(
+                self.data.dataframe(compact=compact)))
+
+    def test_values_are_escaped(self):
+        data = Timesheets(date(2021, 1, 1), date(2021, 1, 2), employees=2,
+                          cost_centers=['R&D <1>'])
+        parsed = to_dataframe(parse_xml(data.xml_chunks()), SCHEMA)
+        self.assertEqual(list(parsed['ACCT_CD'].unique()), ['R&D <1>'])
+        self.assertTrue(parsed.equals(data.dataframe()))
+
+    def test_shape_and_cardinality(self):
+        df = self.data.dataframe()
+        self.assertEqual(len(df), 40 * 90)
+        self.assertEqual(df['EMPLID'].nunique(), 40)
+        self.assertEqual(sorted(df['ACCT_CD'].unique()),
+                         ['F94170', 'F94171'])
+        self.assertLessEqual(df['USER_FIELD_2'].nunique(), 7)
+        self.assertAlmostEqual((df['USER_FIELD_3'] == '').mean(), 0.5,
+                               delta=0.05)
+        self.assertAlmostEqual(df['TL_QUANTITY'].isna().mean(), 0.1,
+                               delta=0.03)
+        self.assertEqual(df['DUR'].min(), date(2021, 1, 1))
+
+    def test_slices_do_not_depend_on_blocks(self):
+        data = Timesheets(date(2021, 1, 1), date(2021, 12, 31),
+                          employees=400, weekends=False)
+        self.assertGreater(data.rows, BLOCK)
+        whole = data.columns()
+        part = data.columns(BLOCK - 10, BLOCK + 10)
+        for name, values in part.items():
+            self.assertEqual(list(values),
+                             list(whole[name][BLOCK - 10:BLOCK + 10]))
+        self.assertTrue(all(day.weekday() < 5 for day in data.days))
+
+    def test_fake_server_streams_timesheets(self):
+        with FakePeopleSoft(timesheets=lambda start, end, cost_center:
+                            Timesheets(start, end, employees=30,
+                                       cost_centers=[cost_center])
+                            ) as server:
+            obj = server.client()
+            df = obj.get_data(date(2021, 1, 1), date(2021, 1, 31),
+                              'F94170', '102')
+            obj.session.close()
+        self.assertEqual(len(df), 30 * 31)
+        self.assertEqual(list(df['ACCT_CD'].unique()), ['F94170'])
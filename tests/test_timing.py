@@ -0,0 +1,32 @@
+import unittest
+from datetime import date
+from .fakes import FakeQuery
+from ghrs.timing import Timings
+
+
+class TestTimings(unittest.TestCase):
+
+    def setUp(self):
+
+        self.obj = FakeQuery()
+        self.timings = Timings()
+        self.samples = []
+        self.obj.hooks = [self.timings, self.samples.append]
+
+    def test_phases_of_get_data_are_reported(self):
+        self.obj.get_data(date(2021, 1, 1), date(2021, 2, 28), 'F94170',
+                          '102', chunk='month')
+        phases = [s.phase for s in self.samples]
+        self.assertEqual(phases.count('submit'), 2)
+        self.assertEqual(phases.count('read_form'), 4)
+        self.assertEqual(phases[-1], 'get_data')
+        summary = self.timings.summary()
+        self.assertEqual(summary.loc['parse_xml', 'rows'], 2 * 59)
+        self.assertEqual(summary.loc['convert', 'rows'], 2 * 59)
+        self.assertEqual(summary.loc['get_data', 'rows'], 2 * 59)
+        self.assertGreater(summary.loc['download', 'bytes'], 0)
+        self.assertTrue((summary['seconds'] >= 0).all())
+        self.assertIn('parse_xml', self.timings.report())
+
+    def test_no_hooks_by_default(self):
+        self.assertEqual(FakeQuery().hooks, ())